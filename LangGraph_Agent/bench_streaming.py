@@ -0,0 +1,80 @@
+"""Time-to-first-token of the chat graph: blocking invoke (render after the
+node returns) vs. token streaming with stream_mode="messages". Uses a local
+stub chat model with injected latency, so it runs offline.
+
+    python bench_streaming.py
+    python bench_streaming.py --first-token 0.8 --per-token 0.03 --tokens 300
+"""
+import argparse
+import time
+import uuid
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langgraph.checkpoint.memory import InMemorySaver
+from chat_graph import build_graph, stream_reply
+
+
+class StubChatModel(BaseChatModel):
+    """Waits first_token seconds, then emits `tokens` words per_token apart."""
+
+    first_token: float
+    per_token: float
+    tokens: int
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.first_token)
+        for i in range(self.tokens):
+            if i:
+                time.sleep(self.per_token)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=f"word{i} "))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        text = "".join(chunk.text for chunk in self._stream(messages, stop))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--first-token", type=float, default=0.5)
+    parser.add_argument("--per-token", type=float, default=0.02)
+    parser.add_argument("--tokens", type=int, default=150)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    llm = StubChatModel(first_token=args.first_token, per_token=args.per_token, tokens=args.tokens)
+    graph = build_graph(llm, InMemorySaver())
+
+    def blocking(config):
+        # Previous behaviour: nothing can be shown until the node has returned
+        start = time.perf_counter()
+        graph.invoke({"messages": [{"role": "user", "content": "hello"}]}, config)
+        elapsed = time.perf_counter() - start
+        return elapsed, elapsed
+
+    def streaming(config):
+        start = time.perf_counter()
+        first = None
+        for _ in stream_reply(graph, "hello", config):
+            if first is None:
+                first = time.perf_counter() - start
+        return first, time.perf_counter() - start
+
+    for name, run in (("invoke", blocking), ("stream", streaming)):
+        ttft = total = 0.0
+        for _ in range(args.runs):
+            first, elapsed = run({"configurable": {"thread_id": uuid.uuid4().hex}})
+            ttft += first / args.runs
+            total += elapsed / args.runs
+        print(f"{name:<7} first token {ttft:6.2f} s   full reply {total:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+from typing import Annotated
+from typing_extensions import NotRequired, TypedDict
+from langchain_core.messages import SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+
+SUMMARY_PROMPT = (
+    "Update the running summary of a conversation with the new lines below. "
+    "Keep names, facts and open questions; stay under 150 words.\n\n"
+    "Current summary:\n{summary}\n\nNew lines:\n{lines}\n\nUpdated summary:"
+)
+
+
+# Define our state: add_messages appends each node's new messages to the thread.
+# messages keeps the whole transcript (for display); the first `summarized`
+# of them are folded into `summary` and no longer sent to the model.
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+    summary: NotRequired[str]
+    summarized: NotRequired[int]
+
+
+def build_graph(llm, checkpointer=None, budget=2000, count_tokens=count_tokens_approximately, summarizer=None):
+    """Chat graph whose model prompt stays within `budget` tokens.
+
+    The memory node runs before every reply. When the running summary plus
+    the unsummarized messages exceed the budget, it folds the oldest of those
+    messages into the summary until they fit in 3/4 of it (so the summary is
+    not refreshed on every turn). Only the newly folded messages are sent to
+    the summarizer, together with the previous summary.
+    """
+    summarizer = summarizer or llm
+
+    def prompt_tokens(summary, window):
+        return count_tokens([SystemMessage(content=summary)] + window) if summary else count_tokens(window)
+
+    # Define our memory node
+    def memory(state: State):
+        summary = state.get("summary", "")
+        summarized = state.get("summarized", 0)
+        window = state["messages"][summarized:]
+        if prompt_tokens(summary, window) <= budget:
+            return {}
+        folded = []
+        # Always keep the newest message: it is the one being answered
+        while len(window) > 1 and prompt_tokens(summary, window) > budget * 3 // 4:
+            folded.append(window.pop(0))
+        lines = "\n".join(f"{'User' if m.type == 'human' else 'Assistant'}: {m.content}" for m in folded)
+        summary = summarizer.invoke(SUMMARY_PROMPT.format(summary=summary or "(empty)", lines=lines)).content.strip()
+        return {"summary": summary, "summarized": summarized + len(folded)}
+
+    # Define our chatbot node
+    def chatbot(state: State):
+        prompt = state["messages"][state.get("summarized", 0):]
+        if state.get("summary"):
+            prompt = [SystemMessage(content=f"Summary of the earlier conversation: {state['summary']}")] + prompt
+        response = llm.invoke(prompt)
+        # Return only the new message; the checkpointer already holds the history
+        return {"messages": [response]}
+
+    # Build our graph
+    graph_builder = StateGraph(State)
+    graph_builder.add_node("memory", memory)
+    graph_builder.add_node("chatbot", chatbot)
+    graph_builder.add_edge(START, "memory")
+    graph_builder.add_edge("memory", "chatbot")
+    graph_builder.add_edge("chatbot", END)
+    return graph_builder.compile(checkpointer=checkpointer)
+
+
+def stream_reply(graph, user_input: str, config):
+    """Runs one turn and yields the reply's text as the model produces it.
+
+    stream_mode="messages" hands over each LLM token from inside the node
+    (llm.invoke there streams when a graph stream is listening), instead of
+    waiting for the node to return. The finished turn is checkpointed as usual.
+    """
+    for chunk, metadata in graph.stream(
+        {"messages": [{"role": "user", "content": user_input}]}, config, stream_mode="messages"
+    ):
+        if metadata.get("langgraph_node") == "chatbot" and chunk.content:
+            yield chunk.content
@@ -0,0 +1,119 @@
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+# channel_values key that stands in for the message list in a stored checkpoint
+MESSAGE_IDS = "__message_ids__"
+
+
+# -------------------------------
+# SQLite checkpointer that writes message deltas
+# -------------------------------
+class MessageDeltaSaver(SqliteSaver):
+    """SqliteSaver that stores each message body once per thread.
+
+    SqliteSaver serializes the full channel values into every checkpoint, so
+    each turn would rewrite the whole conversation (several times, once per
+    superstep). Here the `messages` channel is replaced by its list of
+    message ids before the checkpoint is written; bodies go to
+    message_bodies, and only ids not stored yet are serialized. Reading a
+    checkpoint puts the bodies back.
+
+    Only the newest keep_checkpoints checkpoints of a thread are kept (the
+    app resumes from the latest one and never time-travels), so storage
+    grows with the messages, not with turns x history.
+    """
+
+    def __init__(self, conn, *, serde=None, keep_checkpoints=2):
+        super().__init__(conn, serde=serde)
+        self.keep_checkpoints = keep_checkpoints
+
+    def setup(self):
+        if not self.is_setup:
+            self.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS message_bodies (
+                    thread_id TEXT NOT NULL,
+                    message_id TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    PRIMARY KEY (thread_id, message_id)
+                );
+                """
+            )
+        super().setup()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        messages = checkpoint["channel_values"].get("messages")
+        if messages:
+            thread_id = str(config["configurable"]["thread_id"])
+            ids = [message.id for message in messages]
+            with self.cursor() as cur:
+                stored = set()
+                for start in range(0, len(ids), 500):
+                    part = ids[start:start + 500]
+                    cur.execute(
+                        f"SELECT message_id FROM message_bodies WHERE thread_id = ? "
+                        f"AND message_id IN ({','.join('?' * len(part))})",
+                        [thread_id, *part],
+                    )
+                    stored.update(row[0] for row in cur.fetchall())
+                cur.executemany(
+                    "INSERT INTO message_bodies (thread_id, message_id, type, body) VALUES (?, ?, ?, ?)",
+                    [
+                        (thread_id, message.id, *self.serde.dumps_typed(message))
+                        for message in messages if message.id not in stored
+                    ],
+                )
+            channel_values = {key: value for key, value in checkpoint["channel_values"].items() if key != "messages"}
+            channel_values[MESSAGE_IDS] = ids
+            checkpoint = {**checkpoint, "channel_values": channel_values}
+
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        self._prune(saved["configurable"])
+        return saved
+
+    def _prune(self, configurable):
+        with self.cursor() as cur:
+            cur.execute(
+                "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT -1 OFFSET ?",
+                (str(configurable["thread_id"]), configurable["checkpoint_ns"], self.keep_checkpoints),
+            )
+            old = [(configurable["thread_id"], configurable["checkpoint_ns"], row[0]) for row in cur.fetchall()]
+            for table in ("writes", "checkpoints"):
+                cur.executemany(
+                    f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", old
+                )
+
+    def _hydrate(self, checkpoint_tuple):
+        if checkpoint_tuple is None or MESSAGE_IDS not in checkpoint_tuple.checkpoint["channel_values"]:
+            return checkpoint_tuple
+        channel_values = dict(checkpoint_tuple.checkpoint["channel_values"])
+        ids = channel_values.pop(MESSAGE_IDS)
+        thread_id = str(checkpoint_tuple.config["configurable"]["thread_id"])
+        bodies = {}
+        with self.cursor(transaction=False) as cur:
+            for start in range(0, len(ids), 500):
+                part = ids[start:start + 500]
+                cur.execute(
+                    f"SELECT message_id, type, body FROM message_bodies WHERE thread_id = ? "
+                    f"AND message_id IN ({','.join('?' * len(part))})",
+                    [thread_id, *part],
+                )
+                for message_id, type_, body in cur.fetchall():
+                    bodies[message_id] = self.serde.loads_typed((type_, body))
+        channel_values["messages"] = [bodies[message_id] for message_id in ids]
+        return checkpoint_tuple._replace(checkpoint={**checkpoint_tuple.checkpoint, "channel_values": channel_values})
+
+    def get_tuple(self, config):
+        return self._hydrate(super().get_tuple(config))
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        # SqliteSaver.list yields while holding the connection lock, so collect first
+        checkpoint_tuples = [*super().list(config, filter=filter, before=before, limit=limit)]
+        for checkpoint_tuple in checkpoint_tuples:
+            yield self._hydrate(checkpoint_tuple)
+
+    def delete_thread(self, thread_id):
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM message_bodies WHERE thread_id = ?", (str(thread_id),))
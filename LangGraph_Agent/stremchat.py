@@ -1,10 +1,11 @@
 import streamlit as st
-from typing import Dict, List
-from langgraph.graph import StateGraph, START, END
+import sqlite3
+import uuid
 from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
 import os
-import time
+from chat_graph import build_graph, stream_reply
+from checkpoint_store import MessageDeltaSaver
 
 # Load environment variables
 load_dotenv()
@@ -172,33 +173,20 @@ def local_css():
     </style>
     """, unsafe_allow_html=True)
 
-# Define our state
-class State(dict):
-    message: List[Dict[str, str]]  # Type hint for IDE, linters, etc.
+# One checkpointed graph per process; conversations are separated by thread id
+@st.cache_resource
+def load_graph():
+    conn = sqlite3.connect("chat_checkpoints.sqlite3", check_same_thread=False)
+    # Prompts stay within 3000 tokens (older turns go into a running summary),
+    # well inside mistral-7b-instruct's context even with a 1000-token reply
+    return build_graph(llm, checkpointer=MessageDeltaSaver(conn), budget=3000)
 
-    def __init__(self):
-        super().__init__()
-        self["message"] = []
+graph = load_graph()
 
-# Define our chatbot node
-def chatbot(state: State) -> State:
-    # Send the ENTIRE message history to the LLM
-    response = llm.invoke(state["message"])
-    state["message"].append({"role": "assistant", "content": response.content})
-    return state
-
-# Build our graph
-graph_builder = StateGraph(State)
-graph_builder.add_node("chatbot", chatbot)
-graph_builder.add_edge(START, "chatbot")
-graph_builder.add_edge("chatbot", END)
-graph = graph_builder.compile()
-
-# Initialize session state
-if "conversation_state" not in st.session_state:
-    st.session_state.conversation_state = State()
-if "messages" not in st.session_state:
-    st.session_state.messages = []
+# The thread id lives in the URL, so a reload resumes the same conversation
+if "thread" not in st.query_params:
+    st.query_params["thread"] = uuid.uuid4().hex
+config = {"configurable": {"thread_id": st.query_params["thread"]}}
 
 # Project explanation in sidebar
 def show_sidebar_explanation():
@@ -230,6 +218,10 @@ def show_sidebar_explanation():
     </div>
     """, unsafe_allow_html=True)
 
+    if st.sidebar.button("New conversation"):
+        st.query_params["thread"] = uuid.uuid4().hex
+        st.rerun()
+
 # Streamlit app
 def main():
     local_css()
@@ -241,11 +233,12 @@ def main():
     chat_container = st.container()
     
     with chat_container:
-        for message in st.session_state.messages:
-            if message["role"] == "user":
-                st.markdown(f'<div class="message user-message">{message["content"]}</div>', unsafe_allow_html=True)
+        # Latest checkpoint of this thread; nothing is replayed through the LLM
+        for message in graph.get_state(config).values.get("messages", []):
+            if message.type == "human":
+                st.markdown(f'<div class="message user-message">{message.content}</div>', unsafe_allow_html=True)
             else:
-                st.markdown(f'<div class="message assistant-message">{message["content"]}</div>', unsafe_allow_html=True)
+                st.markdown(f'<div class="message assistant-message">{message.content}</div>', unsafe_allow_html=True)
     
     # Input form with submit button
     with st.form(key='chat_form'):
@@ -258,12 +251,10 @@ def main():
         submit_button = st.form_submit_button(label="Send")
     
     if submit_button and user_input:
-        # Add user message to state and display
-        st.session_state.conversation_state["message"].append({"role": "user", "content": user_input})
-        st.session_state.messages.append({"role": "user", "content": user_input})
-        
-        # Show typing indicator
+        # Show the question and a typing indicator until the first token arrives
         with chat_container:
+            st.markdown(f'<div class="message user-message">{user_input}</div>', unsafe_allow_html=True)
+            reply_placeholder = st.empty()
             typing_html = """
             <div class="typing-indicator">
                 <div class="typing-dot"></div>
@@ -271,13 +262,14 @@ def main():
                 <div class="typing-dot"></div>
             </div>
             """
-            st.markdown(typing_html, unsafe_allow_html=True)
+            reply_placeholder.markdown(typing_html, unsafe_allow_html=True)
         
-        # Get assistant response
-        for event in graph.stream(st.session_state.conversation_state):
-            for value in event.values():
-                assistant_response = value["message"][-1]["content"]
-                st.session_state.messages.append({"role": "assistant", "content": assistant_response})
+        # Stream the assistant response token by token; only this turn's message is sent,
+        # the checkpointer adds the history
+        reply = ""
+        for token in stream_reply(graph, user_input, config):
+            reply += token
+            reply_placeholder.markdown(f'<div class="message assistant-message">{reply}▌</div>', unsafe_allow_html=True)
         
         # Clear the input by rerunning
         st.rerun()
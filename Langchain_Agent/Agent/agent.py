@@ -1,29 +1,30 @@
 from langchain_openai import ChatOpenAI
 from langchain_core.tools import tool
 from langchain_community.tools import DuckDuckGoSearchRun
-from langchain import hub
 from dotenv import load_dotenv
 from langchain.agents import create_react_agent, AgentExecutor
 from langchain_community.utilities import WikipediaAPIWrapper
 from langchain.tools.wikipedia.tool import WikipediaQueryRun
 
 import os
-import requests
 from datetime import datetime
+from parallel_tools import parallel_travel_answer, travel_tool_calls
+from plan_execute import plan_and_execute
+from weather_client import WeatherClient
+from tool_cache import CachedTool, ToolResultCache
+from local_wiki import LocalWikipedia, LocalWikipediaQueryRun
+from prompt_registry import load_prompt
 
 # Load environment variables
 load_dotenv()
-WEATHER_API_KEY = os.getenv("WEATHERAPI_KEY")
+weather_client = WeatherClient(api_key=os.getenv("WEATHERAPI_KEY"))
 
 # Define tools
 @tool
 def get_weather(location: str) -> str:
     """Fetches current weather data for a specified location using WeatherAPI."""
-    url = f"http://api.weatherapi.com/v1/current.json?key={WEATHER_API_KEY}&q={location}"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        weather_data = response.json()
+        weather_data = weather_client.current(location)
         return (
             f"Current Weather in {weather_data['location']['name']}, {weather_data['location']['country']}:\n"
             f"- Temperature: {weather_data['current']['temp_c']}°C\n"
@@ -39,15 +40,20 @@ def get_date() -> str:
     """Returns the current date and time."""
     return f"Current date and time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
 
-# Tools
-search_tool = DuckDuckGoSearchRun()
-wikipedia = WikipediaQueryRun(api_wrapper=WikipediaAPIWrapper())
+# Tools (search and Wikipedia results are cached on disk between runs)
+tool_cache = ToolResultCache()
+search_tool = CachedTool(DuckDuckGoSearchRun(), tool_cache)
+# WIKIPEDIA_INDEX points at an index built with local_wiki.py: no network needed
+if os.getenv("WIKIPEDIA_INDEX"):
+    wikipedia = LocalWikipediaQueryRun(index=LocalWikipedia(os.getenv("WIKIPEDIA_INDEX")))
+else:
+    wikipedia = CachedTool(WikipediaQueryRun(api_wrapper=WikipediaAPIWrapper()), tool_cache)
 
 tools = [search_tool, get_weather, wikipedia, get_date]
 
 # LLM and prompt
 llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0, max_tokens=1000)
-react_prompt = hub.pull("hwchase17/react")
+react_prompt = load_prompt("hwchase17/react")  # vendored copy, see prompt_registry.py
 
 # Create agent
 agent = create_react_agent(llm=llm, tools=tools, prompt=react_prompt)
@@ -60,14 +66,25 @@ agent_executer = AgentExecutor(
     handle_parsing_errors=True,  # ✅ Add this to prevent crashing on invalid outputs
 )
 
-# Run agent
-response = agent_executer.invoke({
-    "input": (
-        "I want to visit Mawsynram, Meghalaya. What's the current weather there? "
-        "Also find information about popular tourist spots from Wikipedia "
-        "and tell me what date I should plan my visit for optimal weather."
-    )
-})
+question = (
+    "I want to visit Mawsynram, Meghalaya. What's the current weather there? "
+    "Also find information about popular tourist spots from Wikipedia "
+    "and tell me what date I should plan my visit for optimal weather."
+)
+
+# Run agent (AGENT_MODE=parallel runs all tools at once, then one LLM call;
+# AGENT_MODE=plan makes one planning call, runs the plan as a DAG, then one LLM call)
+named_tools = {"Weather API": get_weather, "Wikipedia": wikipedia, "Web Search": search_tool, "Date/Time": get_date}
+if os.getenv("AGENT_MODE") == "parallel":
+    response = parallel_travel_answer(llm, named_tools, "Mawsynram, Meghalaya", question)
+    print(f"Tools: {response['timings']['tools']:.1f}s, LLM: {response['timings']['llm']:.1f}s")
+elif os.getenv("AGENT_MODE") == "plan":
+    response = plan_and_execute(llm, named_tools, question, fallback_calls=travel_tool_calls("Mawsynram, Meghalaya"))
+    timings = response["timings"]
+    print(f"Plan: {timings['plan']:.1f}s, Tools: {timings['tools']:.1f}s, LLM: {timings['llm']:.1f}s")
+else:
+    response = agent_executer.invoke({"input": question})
 
 # Output result
 print(response['output'])
+print(tool_cache.summary())
@@ -0,0 +1,105 @@
+"""Wall-clock comparison: ReAct-style sequential tool use vs. concurrent tool
+dispatch with a single synthesis call vs. plan-and-execute (one planning call,
+the plan run as a DAG, one synthesis call). Uses local stub tools and a
+scripted stub LLM with injected latency, so it runs offline.
+
+    python bench_parallel_tools.py
+    python bench_parallel_tools.py --llm-latency 0.8 --search-latency 2.0
+"""
+import argparse
+import json
+import time
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+from parallel_tools import parallel_travel_answer
+from plan_execute import plan_and_execute
+
+# What the planner is scripted to return: the four travel lookups, plus a
+# search that needs the Wikipedia result first
+PLAN = {"steps": [
+    {"id": "s1", "tool": "Weather API", "input": "Mawsynram", "depends_on": []},
+    {"id": "s2", "tool": "Wikipedia", "input": "Mawsynram", "depends_on": []},
+    {"id": "s3", "tool": "Web Search", "input": "best time to visit Mawsynram", "depends_on": []},
+    {"id": "s4", "tool": "Date/Time", "input": {}, "depends_on": []},
+    {"id": "s5", "tool": "Web Search", "input": "how to reach {s2}", "depends_on": ["s2"]},
+]}
+
+
+class StubLLM:
+    """Sleeps like a remote model, then returns the scripted replies in turn
+    (cycling), or a canned answer."""
+
+    def __init__(self, latency, script=None):
+        self.latency = latency
+        self.script = script or ["stub answer"]
+        self.calls = 0
+
+    def invoke(self, prompt, config=None):
+        reply = self.script[self.calls % len(self.script)]
+        self.calls += 1
+        time.sleep(self.latency)
+        return AIMessage(content=reply)
+
+
+def make_stub_tools(args):
+    @tool
+    def weather(location: str) -> str:
+        """Stub weather lookup."""
+        time.sleep(args.weather_latency)
+        return f"Sunny in {location}"
+
+    @tool
+    def wikipedia(query: str) -> str:
+        """Stub Wikipedia lookup."""
+        time.sleep(args.wiki_latency)
+        return f"Article about {query}"
+
+    @tool
+    def search(query: str) -> str:
+        """Stub web search."""
+        time.sleep(args.search_latency)
+        return f"Results for {query}"
+
+    @tool
+    def date() -> str:
+        """Stub clock."""
+        return "2025-01-01 00:00:00"
+
+    return {"Weather API": weather, "Wikipedia": wikipedia, "Web Search": search, "Date/Time": date}
+
+
+def sequential(llm, tools, calls):
+    # ReAct: one LLM step to choose each tool, then one to write the answer
+    for name, tool_input in calls:
+        llm.invoke("thought")
+        tools[name].invoke(tool_input)
+    return llm.invoke("final answer")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--weather-latency", type=float, default=0.3)
+    parser.add_argument("--wiki-latency", type=float, default=0.8)
+    parser.add_argument("--search-latency", type=float, default=1.2)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    tools = make_stub_tools(args)
+    plan_calls = [(step["tool"], step["input"]) for step in PLAN["steps"]]
+    # parallel cannot express s5 (it needs s2's result), so it makes one call fewer
+    for name, script, run in (
+        ("sequential", None, lambda llm: sequential(llm, tools, plan_calls)),
+        ("parallel", None, lambda llm: parallel_travel_answer(llm, tools, "Mawsynram", "Plan a visit")),
+        ("plan", [json.dumps(PLAN), "stub answer"], lambda llm: plan_and_execute(llm, tools, "Plan a visit")),
+    ):
+        llm = StubLLM(args.llm_latency, script)
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            run(llm)
+        elapsed = (time.perf_counter() - start) / args.runs
+        print(f"{name:<11} {elapsed:6.2f} s/run  {llm.calls // args.runs} LLM calls/run")
+
+
+if __name__ == "__main__":
+    main()
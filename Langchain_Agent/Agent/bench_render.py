@@ -0,0 +1,84 @@
+"""Latency of formatting an HR query result: the built-in table renderer vs.
+the LLM "beautify" pass it replaces. Runs offline against a stub LLM that
+takes time-to-first-token plus one output token per 1/tokens-per-second for
+a reply the size of the table; --model times a real OpenAI model instead.
+
+    python bench_render.py
+    python bench_render.py --rows 5 20 200 --model gpt-4o-mini
+"""
+import argparse
+import datetime
+import decimal
+import time
+import pyarrow as pa
+from langchain_core.messages import AIMessage
+from result_render import render_html, render_markdown
+from sql_results import QueryResult, approx_token_counter
+
+DEPARTMENTS = ["Engineering", "Sales", "Marketing", "Finance", "HR"]
+
+
+class StubLLM:
+    """Sleeps like a remote model writing `reply`, then returns it."""
+
+    def __init__(self, first_token, tokens_per_second, reply):
+        self.first_token = first_token
+        self.tokens_per_second = tokens_per_second
+        self.reply = reply
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        time.sleep(self.first_token + approx_token_counter(self.reply) / self.tokens_per_second)
+        return AIMessage(content=self.reply)
+
+
+def sample_result(rows):
+    table = pa.table({
+        "employee_id": pa.array(range(1001, 1001 + rows)),
+        "name": pa.array([f"Employee {i}" for i in range(rows)]),
+        "department": pa.array([DEPARTMENTS[i % len(DEPARTMENTS)] for i in range(rows)]),
+        "hire_date": pa.array([datetime.date(2018, 1, 1) + datetime.timedelta(days=37 * i) for i in range(rows)]),
+        "salary": pa.array([decimal.Decimal(f"{55000 + 1250 * i}.50") for i in range(rows)], type=pa.decimal128(10, 2)),
+    })
+    return QueryResult("SELECT ...", table)
+
+
+def timed(run, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 20, 200])
+    parser.add_argument("--render-rows", type=int, default=20)
+    parser.add_argument("--first-token", type=float, default=0.6)
+    parser.add_argument("--tokens-per-second", type=float, default=80.0)
+    parser.add_argument("--model", help="time this OpenAI model instead of the stub")
+    parser.add_argument("--runs", type=int, default=2)
+    args = parser.parse_args()
+
+    if args.model:
+        from langchain_openai import ChatOpenAI
+        llm = ChatOpenAI(model=args.model, temperature=0)
+
+    print(f"{'rows':>6} {'html':>10} {'markdown':>10} {'llm':>10}  speedup")
+    for rows in args.rows:
+        result = sample_result(rows)
+        html_seconds = timed(lambda: render_html(result, max_rows=args.render_rows), 200)
+        markdown_seconds = timed(lambda: render_markdown(result, max_rows=args.render_rows), 200)
+        # Same prompt as hragent.py; the reply is about as long as the rendered table
+        prompt = ("You are a helpful assistant. Beautify the following SQL result and present it in a clean, "
+                  f"readable way for the user:\n\n{result.preview(max_tokens=800)}")
+        if not args.model:
+            llm = StubLLM(args.first_token, args.tokens_per_second, render_markdown(result, max_rows=args.render_rows))
+        llm_seconds = timed(lambda: llm.invoke(prompt), args.runs)
+        print(f"{rows:>6} {html_seconds * 1000:>8.2f}ms {markdown_seconds * 1000:>8.2f}ms "
+              f"{llm_seconds:>9.2f}s  {llm_seconds / html_seconds:,.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,17 @@ from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from langchain.agents import initialize_agent, Tool
 from langchain_community.utilities import SQLDatabase
-from langchain_openai import ChatOpenAI
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_core.tools import tool
 import os
+import threading
 import time
+from sql_schema import SchemaCache
+from sql_cache import SQLResultCache
+from question_sql_cache import LLMCallCounter, QuestionSQLCache
+from sql_results import QueryResult, run_query
+from sql_guard import SQLGuard, SQLRejected
+from result_render import render_html
 
 # -------------------------------
 # 🔐 1. Load environment variables
@@ -26,32 +33,60 @@ DB_PORT = os.getenv("MYSQL_PORT", "3306")
 DB_URL = f"mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 engine = create_engine(DB_URL)
 db = SQLDatabase(engine)
+# Rows kept per query; results travel as columnar QueryResult objects
+MAX_ROWS = 5000
+PAGE_SIZE = 50
+# Rows rendered inline in the answer; longer results also get the paginated table
+RENDER_ROWS = 20
+# Formatting answers with the LLM is opt-in: it adds a model round trip per answer
+LLM_FORMATTING = os.getenv("HR_LLM_FORMATTING", "0") == "1"
+
+# Compact per-table descriptions, reflected again only when the DDL changes
+schema_cache = SchemaCache(engine)
+# Agent SQL is checked locally (names, read-only, LIMIT) and by its EXPLAIN
+# plan before it runs
+sql_guard = SQLGuard(engine, schema_cache, max_rows=MAX_ROWS, max_rows_examined=1_000_000)
+
+def run_sql(query):
+    return run_query(engine, sql_guard.check(query), max_rows=MAX_ROWS)
+
+# Repeated read-only queries skip the database while their tables are unchanged
+# (and never for more than 5 minutes)
+result_cache = SQLResultCache(engine, schema_cache, ttl=300)
+# Near-duplicate questions reuse SQL that already ran, without the agent loop
+question_cache = QuestionSQLCache(OpenAIEmbeddings(), threshold=0.95)
+# SQL that last ran successfully in this thread (after any auto-correction)
+last_good_sql = threading.local()
 
 # -------------------------------
 # 🔧 3. Define the SQL Tool with @tool
 
 @tool
-def hr_sql_tool(query: str) -> str:
+def hr_sql_tool(query: str) -> QueryResult:
     """Answer HR questions using SQL database. Returns raw data for formatting."""
     try:
         # Get raw results without any LLM interpretation
-        result = db.run(query)
-        return str(result)  # Return as string to be parsed later
+        result = result_cache.run(query, run_sql)
+        last_good_sql.query = query
+        return result  # The agent sees str(result): a token-bounded preview
     except Exception as e:
         # Error handling remains the same
-        print("⚠ Query failed. Trying auto-correction...")
-        schema = db.get_table_info()
+        print(f"⚠ Query {'rejected' if isinstance(e, SQLRejected) else 'failed'}. Trying auto-correction...")
+        # Only the tables this query (and its error) is about, one line each
+        schema = schema_cache.describe(schema_cache.relevant_tables(f"{query}\n{e}"))
         correction_prompt = f"""
             Rewrite this SQL query using correct schema:
             Schema: {schema}
             Query: {query}
+            Error: {str(e)[:300]}
             Only return the corrected SQL query.
             """
         try:
             corrected_query = llm.predict(correction_prompt).strip()
             print(f"🛠 Corrected SQL:\n{corrected_query}")
-            corrected_result = db.run(corrected_query)
-            return str(corrected_result)
+            corrected_result = result_cache.run(corrected_query, run_sql)
+            last_good_sql.query = corrected_query
+            return corrected_result
         except Exception as inner_e:
             return f"❌ Error: {str(inner_e)}"
 
@@ -80,6 +115,16 @@ agent = initialize_agent(
 # -------------------------------
 # 🎨 Ultra-Visual Streamlit UI
 # -------------------------------
+def show_result(result, key):
+    """Paginated table view of a QueryResult."""
+    pages = result.page_count(PAGE_SIZE)
+    page = 1
+    if pages > 1:
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, key=key)
+    st.dataframe(result.page(page - 1, PAGE_SIZE), use_container_width=True)
+    total = f"{result.num_rows}+" if result.truncated else result.num_rows
+    st.caption(f"{total} rows · page {page} of {pages}")
+
 def main():
     # Page configuration
     st.set_page_config(
@@ -271,6 +316,34 @@ def main():
         .stSpinner > div {
             background-color: var(--primary) !important;
         }
+        
+        .hr-table {
+            border-collapse: collapse;
+            width: 100%;
+            font-size: 14px;
+        }
+        
+        .hr-table th, .hr-table td {
+            padding: 6px 10px;
+            border-bottom: 1px solid rgba(0,0,0,0.08);
+            text-align: left;
+        }
+        
+        .hr-table th {
+            color: var(--primary);
+            font-weight: 600;
+        }
+        
+        .hr-table .num {
+            text-align: right;
+            font-variant-numeric: tabular-nums;
+        }
+        
+        .hr-table-note {
+            font-size: 12px;
+            opacity: 0.7;
+            margin-top: 6px;
+        }
     </style>
     """, unsafe_allow_html=True)
     
@@ -312,6 +385,12 @@ def main():
         </div>
         """, unsafe_allow_html=True)
         
+        llm_formatting = st.toggle(
+            "✨ LLM formatting",
+            value=LLM_FORMATTING,
+            help="Let the model rewrite answers instead of the built-in table renderer (slower).",
+        )
+        
         st.markdown("---")
         st.markdown("""
         <div style="text-align:center; color:var(--text); font-size:14px; opacity: 0.7;">
@@ -351,9 +430,11 @@ def main():
         ]
     
     # Display chat messages
-    for message in st.session_state.messages:
+    for index, message in enumerate(st.session_state.messages):
         with st.chat_message(message["role"]):
             st.markdown(message["content"], unsafe_allow_html=True)
+            if message.get("result") is not None:
+                show_result(message["result"], key=f"page_{index}")
     
     # Chat input
     if prompt := st.chat_input("Ask your HR question..."):
@@ -385,18 +466,48 @@ def main():
                 import time
 
                 start_time = time.time()
-                agent_response = agent({"input": prompt})
 
-                # Step 1: Extract raw result from agent
-                if agent_response.get('intermediate_steps'):
-                    raw_response = agent_response['intermediate_steps'][-1][-1]
-                else:
-                    raw_response = agent_response['output']
+                # Step 1: Reuse the SQL of a near-identical earlier question, if any
+                raw_response = None
+                cached_sql, question_vector = question_cache.lookup(prompt)
+                if cached_sql:
+                    try:
+                        raw_response = result_cache.run(cached_sql, run_sql)
+                    except Exception:
+                        question_cache.forget(cached_sql)  # Stale (e.g. schema changed); ask the agent
+
+                # Otherwise extract raw result from agent
+                if raw_response is None:
+                    last_good_sql.query = None
+                    llm_calls = LLMCallCounter()
+                    agent_response = agent.invoke({"input": prompt}, config={"callbacks": [llm_calls]})
+                    if agent_response.get('intermediate_steps'):
+                        raw_response = agent_response['intermediate_steps'][-1][-1]
+                    else:
+                        raw_response = agent_response['output']
+                    # Keep only SQL that produced the rows being shown
+                    steps = agent_response.get('intermediate_steps')
+                    if (steps and steps[-1][0].tool == hr_sql_tool.name and last_good_sql.query
+                            and not str(raw_response).startswith("❌")):
+                        try:
+                            question_cache.store(prompt, last_good_sql.query, llm_calls.calls, question_vector)
+                        except Exception as e:
+                            print(f"⚠ Could not cache question: {e}")  # The answer is still shown
 
-                # Step 2: Beautify using LLM
-                if "No results" not in str(raw_response):
+                # Step 2: Render rows locally, or beautify using LLM when opted in
+                # (on a bounded preview, never the full result)
+                result = raw_response if isinstance(raw_response, QueryResult) and raw_response.num_rows else None
+                format_start = time.time()
+                if result is not None and not llm_formatting:
+                    final_response = f"""
+                        <div style='margin-bottom: 15px; font-family: Arial, sans-serif;'>
+                            {render_html(result, max_rows=RENDER_ROWS)}
+                        </div>
+                    """
+                elif llm_formatting and "No results" not in str(raw_response):
+                    preview = result.preview(max_tokens=800) if result is not None else str(raw_response)
                     beautify_prompt = f"""You are a helpful assistant. Beautify the following SQL result and present it in a clean, readable way for the user
-                    and make it more engaging and if table requirem generate table with row column:\n\n{raw_response}"""
+                    and make it more engaging and if table requirem generate table with row column:\n\n{preview}"""
                     print(f"💬 Beautifying response: {beautify_prompt}")
 
                     # Pass raw response to LLM
@@ -413,9 +524,19 @@ def main():
                 else:
                     final_response = str(raw_response)
 
+                format_seconds = time.time() - format_start
+
                 # Step 4: Display in Streamlit
                 message_placeholder.markdown(final_response, unsafe_allow_html=True)
-                st.session_state.messages.append({"role": "assistant", "content": final_response})
+                if result is not None and not llm_formatting and result.num_rows <= RENDER_ROWS:
+                    result = None  # Already shown in full
+                st.session_state.messages.append({"role": "assistant", "content": final_response, "result": result})
+                if result is not None:
+                    show_result(result, key=f"page_{len(st.session_state.messages) - 1}")
+                st.caption(
+                    f"{question_cache.summary()} · {result_cache.summary()} · {sql_guard.summary()} · "
+                    f"formatted {'by LLM' if llm_formatting else 'locally'} in {format_seconds * 1000:.0f} ms"
+                )
 
 
                 
@@ -0,0 +1,200 @@
+"""Offline Wikipedia: a SQLite FTS5 index over an article dump or a directory
+of text files, plus a tool that stands in for WikipediaQueryRun.
+
+    python local_wiki.py import --jsonl extracted/*.jsonl   # WikiExtractor --json output
+    python local_wiki.py import --dir ./articles            # one article per .txt/.md file
+    python local_wiki.py search "Mawsynram rainfall"
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+from typing import Type
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, Field
+
+NO_RESULT = "No good Wikipedia Search Result was found"
+
+
+def fts_query(text: str) -> str:
+    """Free text to an FTS5 query: every word quoted (so punctuation and
+    operators in user input are harmless), any word may match, bm25 ranks."""
+    words = re.findall(r"\w+", text.lower())
+    return " OR ".join(f'"{word}"' for word in words if len(word) > 1)
+
+
+# -------------------------------
+# Full-text article index
+# -------------------------------
+class LocalWikipedia:
+    """Articles live in `pages`; `articles` is an external-content FTS5 index
+    over them, kept in step by triggers. Title matches weigh more than body
+    matches when ranking."""
+
+    def __init__(self, path="./wiki_index.sqlite3", title_weight=10.0):
+        self.path = path
+        self.title_weight = title_weight
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                id INTEGER PRIMARY KEY,
+                title TEXT NOT NULL UNIQUE,
+                body TEXT NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles USING fts5(
+                title, body, content='pages', content_rowid='id', tokenize='porter unicode61'
+            );
+            CREATE TRIGGER IF NOT EXISTS pages_ai AFTER INSERT ON pages BEGIN
+                INSERT INTO articles (rowid, title, body) VALUES (new.id, new.title, new.body);
+            END;
+            CREATE TRIGGER IF NOT EXISTS pages_ad AFTER DELETE ON pages BEGIN
+                INSERT INTO articles (articles, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+            END;
+            CREATE TRIGGER IF NOT EXISTS pages_au AFTER UPDATE ON pages BEGIN
+                INSERT INTO articles (articles, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+                INSERT INTO articles (rowid, title, body) VALUES (new.id, new.title, new.body);
+            END;
+            """
+        )
+        self._conn.commit()
+
+    def import_articles(self, articles, batch_size=1000) -> int:
+        """Bulk-loads (title, text) pairs; a title seen again replaces its text.
+        Returns the number of articles written."""
+        written = 0
+        batch = []
+        with self._lock:
+            # A rebuildable index: trade crash safety for import speed
+            self._conn.execute("PRAGMA synchronous = OFF")
+            for title, text in articles:
+                if title and text and text.strip():
+                    batch.append((title.strip(), text.strip()))
+                if len(batch) >= batch_size:
+                    written += self._write(batch)
+                    batch = []
+            written += self._write(batch)
+            # Merge the FTS segments written by many small transactions
+            self._conn.execute("INSERT INTO articles (articles) VALUES ('optimize')")
+            self._conn.commit()
+            self._conn.execute("PRAGMA synchronous = FULL")
+        return written
+
+    def _write(self, batch) -> int:
+        self._conn.executemany(
+            "INSERT INTO pages (title, body) VALUES (?, ?) "
+            "ON CONFLICT (title) DO UPDATE SET body = excluded.body",
+            batch,
+        )
+        self._conn.commit()
+        return len(batch)
+
+    def search(self, query: str, k=3, snippet_tokens=48):
+        """Returns [(title, snippet, score)], best match first."""
+        match = fts_query(query)
+        if not match:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT title, snippet(articles, 1, '', '', ' ... ', ?), bm25(articles, ?, 1.0) AS score
+                    FROM articles WHERE articles MATCH ? ORDER BY score LIMIT ?""",
+                (snippet_tokens, self.title_weight, match, k),
+            ).fetchall()
+        # bm25() is lower-is-better; flip it so callers can read it as a score
+        return [(title, snippet, -score) for title, snippet, score in rows]
+
+    def article(self, title: str):
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM pages WHERE title = ?", (title,)).fetchone()
+        return row[0] if row else None
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def iter_jsonl(paths):
+    """(title, text) from JSON lines with "title" and "text" keys."""
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    yield record.get("title"), record.get("text")
+
+
+def iter_directory(root: str, extensions=(".txt", ".md")):
+    """(title, text) for every text file below root; the file name is the title."""
+    for dirpath, _, filenames in os.walk(root):
+        for name in sorted(filenames):
+            stem, extension = os.path.splitext(name)
+            if extension.lower() in extensions:
+                with open(os.path.join(dirpath, name), "r", encoding="utf-8", errors="replace") as file:
+                    yield stem.replace("_", " "), file.read()
+
+
+# -------------------------------
+# Drop-in tool
+# -------------------------------
+class LocalWikipediaInput(BaseModel):
+    query: str = Field(description="query to look up on wikipedia")
+
+
+class LocalWikipediaQueryRun(BaseTool):
+    """Answers like WikipediaQueryRun ("Page: ...\\nSummary: ..."), from disk."""
+
+    name: str = "wikipedia"
+    description: str = (
+        "A wrapper around Wikipedia. "
+        "Useful for when you need to answer general questions about "
+        "people, places, companies, facts, historical events, or other subjects. "
+        "Input should be a search query."
+    )
+    args_schema: Type[BaseModel] = LocalWikipediaInput
+    index: LocalWikipedia
+    top_k_results: int = 3
+    doc_content_chars_max: int = 4000
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def _run(self, query: str, run_manager=None) -> str:
+        results = self.index.search(query, k=self.top_k_results)
+        if not results:
+            return NO_RESULT
+        pages = "\n\n".join(f"Page: {title}\nSummary: {snippet}" for title, snippet, _ in results)
+        return pages[: self.doc_content_chars_max]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--index", default="./wiki_index.sqlite3")
+    commands = parser.add_subparsers(dest="command", required=True)
+    load = commands.add_parser("import", help="bulk-load articles")
+    load.add_argument("--jsonl", nargs="*", default=[])
+    load.add_argument("--dir")
+    find = commands.add_parser("search", help="ranked lookup")
+    find.add_argument("query")
+    find.add_argument("-k", type=int, default=3)
+    args = parser.parse_args()
+
+    index = LocalWikipedia(args.index)
+    if args.command == "import":
+        written = index.import_articles(iter_jsonl(args.jsonl))
+        if args.dir:
+            written += index.import_articles(iter_directory(args.dir))
+        print(f"Imported {written} articles; index holds {index.count()}")
+    else:
+        for title, snippet, score in index.search(args.query, k=args.k):
+            print(f"{score:8.3f}  {title}\n          {snippet}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
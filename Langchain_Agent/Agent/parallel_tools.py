@@ -0,0 +1,87 @@
+import asyncio
+import time
+from langchain_core.agents import AgentAction
+
+# Per-tool timeouts in seconds; anything not listed gets DEFAULT_TIMEOUT
+TOOL_TIMEOUTS = {
+    "Weather API": 10,
+    "Web Search": 15,
+    "Wikipedia": 15,
+    "Date/Time": 2,
+}
+DEFAULT_TIMEOUT = 20
+
+SYNTHESIS_PROMPT = """You are a travel assistant. Using only the tool results below, answer the request.
+If a tool failed, work with what is available and say what is missing.
+
+Request: {question}
+
+Tool results:
+{observations}
+
+Answer:"""
+
+
+def travel_tool_calls(location: str):
+    """The lookups every travel question needs; none depends on another."""
+    return [
+        ("Weather API", location),
+        ("Wikipedia", location),
+        ("Web Search", f"best time to visit {location} climate and top attractions"),
+        ("Date/Time", {}),
+    ]
+
+
+async def run_one(tool, tool_input, timeout):
+    start = time.perf_counter()
+    try:
+        observation = await asyncio.wait_for(tool.ainvoke(tool_input), timeout)
+    except asyncio.TimeoutError:
+        observation = f"Error: timed out after {timeout}s"
+    except Exception as e:
+        observation = f"Error: {str(e)}"
+    return observation, time.perf_counter() - start
+
+
+async def arun_tool_calls(tools: dict, calls, timeouts=None):
+    """Runs independent (tool name, input) calls concurrently. Returns
+    [(AgentAction, observation)] in call order, like AgentExecutor's
+    intermediate_steps, plus [(tool name, seconds)] in the same order (a tool
+    called twice gets two entries)."""
+    timeouts = {**TOOL_TIMEOUTS, **(timeouts or {})}
+    results = await asyncio.gather(*[
+        run_one(tools[name], tool_input, timeouts.get(name, DEFAULT_TIMEOUT))
+        for name, tool_input in calls
+    ])
+    steps = [
+        (AgentAction(tool=name, tool_input=tool_input, log=f"parallel call: {name}"), observation)
+        for (name, tool_input), (observation, _) in zip(calls, results)
+    ]
+    durations = [(name, seconds) for (name, _), (_, seconds) in zip(calls, results)]
+    return steps, durations
+
+
+def run_tool_calls(tools: dict, calls, timeouts=None):
+    return asyncio.run(arun_tool_calls(tools, calls, timeouts))
+
+
+def format_observations(steps) -> str:
+    return "\n\n".join(f"[{action.tool}] {observation}" for action, observation in steps)
+
+
+def parallel_travel_answer(llm, tools: dict, location: str, question: str, timeouts=None):
+    """Parallel mode: all travel lookups at once, then a single LLM call.
+    Returns the same keys as AgentExecutor.invoke (output, intermediate_steps)."""
+    start = time.perf_counter()
+    steps, durations = run_tool_calls(tools, travel_tool_calls(location), timeouts)
+    tools_done = time.perf_counter()
+    response = llm.invoke(SYNTHESIS_PROMPT.format(question=question, observations=format_observations(steps)))
+    return {
+        "output": response.content,
+        "intermediate_steps": steps,
+        "timings": {
+            "tools": tools_done - start,
+            "llm": time.perf_counter() - tools_done,
+            "per_tool": durations,
+        },
+    }
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import re
+import time
+from langchain_core.agents import AgentAction
+from parallel_tools import DEFAULT_TIMEOUT, SYNTHESIS_PROMPT, TOOL_TIMEOUTS, format_observations, run_one
+from question_sql_cache import LLMCallCounter
+
+PLANNER_PROMPT = """You plan tool calls for a travel assistant. Use as few calls as will answer the request.
+
+Tools:
+{tools}
+
+Reply with JSON only, in this form:
+{{"steps": [{{"id": "s1", "tool": "<tool name>", "input": "<tool input>", "depends_on": []}}]}}
+
+A step that needs another step's result lists that step's id in depends_on and may
+write {{s1}} in its input to insert it. Steps without dependencies run at the same time.
+
+Request: {question}
+"""
+
+# Longest piece of an earlier result that is substituted into a later step's input
+MAX_SUBSTITUTION = 300
+
+
+def describe_tools(tools: dict) -> str:
+    return "\n".join(f"- {name}: {tool.description}" for name, tool in tools.items())
+
+
+def parse_plan(text: str, tools: dict):
+    """Planner reply -> list of step dicts. Raises ValueError when the reply is
+    not JSON, has no steps or a malformed one, names an unknown tool or step,
+    or contains a cycle."""
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if not match:
+        raise ValueError("planner reply contains no JSON")
+    try:
+        steps = json.loads(match.group(0))["steps"]
+    except (json.JSONDecodeError, KeyError, TypeError) as e:
+        raise ValueError(f"malformed plan: {e}")
+    if not isinstance(steps, list) or not steps:
+        raise ValueError("plan has no steps")
+
+    ids = set()
+    for step in steps:
+        if not isinstance(step, dict) or not isinstance(step.get("id"), str):
+            raise ValueError(f"malformed step (needs a string id): {step!r}")
+        depends_on = step.get("depends_on", [])
+        if not isinstance(depends_on, list) or not all(isinstance(sid, str) for sid in depends_on):
+            raise ValueError(f"step {step['id']}: depends_on must be a list of step ids")
+        if step.get("tool") not in tools:
+            raise ValueError(f"unknown tool in plan: {step.get('tool')}")
+        if step.get("id") in ids:
+            raise ValueError(f"duplicate step id: {step.get('id')}")
+        ids.add(step["id"])
+        step.setdefault("input", "")
+        step.setdefault("depends_on", [])
+    for step in steps:
+        missing = set(step["depends_on"]) - ids
+        if missing:
+            raise ValueError(f"step {step['id']} depends on unknown steps {sorted(missing)}")
+
+    # Kahn's algorithm: every step must be reachable from the steps with no dependencies
+    remaining = {step["id"]: set(step["depends_on"]) for step in steps}
+    while remaining:
+        ready = [sid for sid, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"plan has a dependency cycle among {sorted(remaining)}")
+        for sid in ready:
+            del remaining[sid]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return steps
+
+
+def _fill(tool_input, results: dict):
+    """Replaces {step_id} placeholders with (the start of) that step's result."""
+    if isinstance(tool_input, dict):
+        return {key: _fill(value, results) for key, value in tool_input.items()}
+    if not isinstance(tool_input, str):
+        return tool_input
+    return re.sub(
+        r"\{(\w+)\}",
+        lambda m: str(results[m.group(1)])[:MAX_SUBSTITUTION] if m.group(1) in results else m.group(0),
+        tool_input,
+    )
+
+
+async def aexecute_plan(tools: dict, steps, timeouts=None):
+    """Starts every step as soon as the steps it depends on have finished.
+    Returns [(AgentAction, observation)] in plan order plus per-step durations."""
+    timeouts = {**TOOL_TIMEOUTS, **(timeouts or {})}
+    results, tasks = {}, {}
+
+    async def run(step):
+        if step["depends_on"]:
+            await asyncio.gather(*(tasks[dep] for dep in step["depends_on"]))
+        tool_input = _fill(step["input"], results)
+        observation, seconds = await run_one(tools[step["tool"]], tool_input, timeouts.get(step["tool"], DEFAULT_TIMEOUT))
+        results[step["id"]] = observation
+        return tool_input, observation, seconds
+
+    # parse_plan guarantees dependencies exist and are acyclic, so creation order does not matter
+    for step in steps:
+        tasks[step["id"]] = asyncio.ensure_future(run(step))
+    done = await asyncio.gather(*(tasks[step["id"]] for step in steps))
+
+    intermediate_steps = [
+        (AgentAction(tool=step["tool"], tool_input=tool_input, log=f"plan step {step['id']}"), observation)
+        for step, (tool_input, observation, _) in zip(steps, done)
+    ]
+    durations = {step["id"]: seconds for step, (_, _, seconds) in zip(steps, done)}
+    return intermediate_steps, durations
+
+
+def execute_plan(tools: dict, steps, timeouts=None):
+    return asyncio.run(aexecute_plan(tools, steps, timeouts))
+
+
+def plan_and_execute(llm, tools: dict, question: str, timeouts=None, fallback_calls=None):
+    """Plan-and-execute mode: one planning call, the plan's tool calls run as a
+    DAG, one synthesis call. If the plan cannot be used, fallback_calls
+    ((tool name, input) pairs, run in parallel) are used instead when given.
+    Returns the same keys as AgentExecutor.invoke (output, intermediate_steps),
+    plus llm_calls: model calls actually made, fallbacks included."""
+    start = time.perf_counter()
+    llm_calls = LLMCallCounter()
+    config = {"callbacks": [llm_calls]}
+    reply = llm.invoke(PLANNER_PROMPT.format(tools=describe_tools(tools), question=question), config=config)
+    planned = time.perf_counter()
+    try:
+        steps = parse_plan(reply.content, tools)
+    except ValueError:
+        if fallback_calls is None:
+            raise
+        steps = [
+            {"id": f"s{i}", "tool": name, "input": tool_input, "depends_on": []}
+            for i, (name, tool_input) in enumerate(fallback_calls, 1)
+        ]
+
+    intermediate_steps, durations = execute_plan(tools, steps, timeouts)
+    tools_done = time.perf_counter()
+    response = llm.invoke(SYNTHESIS_PROMPT.format(question=question, observations=format_observations(intermediate_steps)), config=config)
+    return {
+        "output": response.content,
+        "intermediate_steps": intermediate_steps,
+        "llm_calls": llm_calls.calls,
+        "timings": {
+            "plan": planned - start,
+            "tools": tools_done - planned,
+            "llm": time.perf_counter() - tools_done,
+            "per_step": durations,
+        },
+    }
@@ -0,0 +1,86 @@
+"""Hub prompts vendored to local files, so agents start without network access.
+
+    python prompt_registry.py vendor hwchase17/react          # latest hub version
+    python prompt_registry.py vendor hwchase17/react:<commit> # a specific commit
+    python prompt_registry.py check                           # verify every pin
+"""
+import argparse
+import hashlib
+import json
+import os
+from functools import lru_cache
+from langchain_core.prompts import PromptTemplate
+
+PROMPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompts")
+
+
+def template_hash(template: str) -> str:
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()
+
+
+def prompt_path(name: str) -> str:
+    # "hwchase17/react" -> prompts/hwchase17__react.json
+    return os.path.join(PROMPTS_DIR, name.replace("/", "__") + ".json")
+
+
+@lru_cache(maxsize=None)
+def load_prompt(name: str) -> PromptTemplate:
+    """The vendored prompt for a hub name, read from disk once per process.
+    Raises ValueError if the template no longer matches its pinned sha256."""
+    with open(prompt_path(name), "r", encoding="utf-8") as file:
+        record = json.load(file)
+    if template_hash(record["template"]) != record["sha256"]:
+        raise ValueError(f"{name}: template does not match its pinned sha256; re-vendor it")
+    return PromptTemplate(
+        template=record["template"],
+        input_variables=record["input_variables"],
+        metadata={"hub_name": name, "hub_commit": record.get("hub_commit"), "sha256": record["sha256"]},
+    )
+
+
+def vendor(ref: str) -> str:
+    """Pulls ref ("owner/name" or "owner/name:commit") from the hub and pins it
+    to a local file. The only function here that needs network access."""
+    from langchain import hub
+
+    prompt = hub.pull(ref)
+    name, _, commit = ref.partition(":")
+    commit = commit or (prompt.metadata or {}).get("lc_hub_commit_hash")
+    if not commit:
+        raise ValueError(f"{ref}: the hub did not report a commit; vendor {name}:<commit> instead")
+    record = {
+        "name": name,
+        "hub_commit": commit,
+        "input_variables": sorted(prompt.input_variables),
+        "template": prompt.template,
+        "sha256": template_hash(prompt.template),
+    }
+    os.makedirs(PROMPTS_DIR, exist_ok=True)
+    path = prompt_path(name)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(record, file, indent=2, ensure_ascii=False)
+        file.write("\n")
+    load_prompt.cache_clear()
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    pull = commands.add_parser("vendor", help="pull a hub prompt and pin it locally")
+    pull.add_argument("ref")
+    commands.add_parser("check", help="verify every vendored prompt against its pin")
+    args = parser.parse_args()
+
+    if args.command == "vendor":
+        print(f"Vendored {args.ref} to {vendor(args.ref)}")
+    else:
+        for filename in sorted(os.listdir(PROMPTS_DIR)):
+            name = filename[: -len(".json")].replace("__", "/")
+            if not load_prompt(name).metadata["hub_commit"]:
+                raise SystemExit(f"{name}: not pinned to a hub commit; vendor {name}:<commit>")
+            print(f"ok  {name}")
+
+
+if __name__ == "__main__":
+    main()
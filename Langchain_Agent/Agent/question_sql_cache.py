@@ -0,0 +1,173 @@
+import math
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from operator import mul
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+def _unit(vector):
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def sql_literals(sql: str):
+    """String and numeric literals of a query, e.g. 'Priya Sharma', 5."""
+    strings = [s.replace("''", "'").strip("%").lower() for s in re.findall(r"'((?:[^']|'')*)'", sql)]
+    numbers = re.findall(r"(?<![\w.])\d+(?:\.\d+)?(?![\w.])", re.sub(r"'(?:[^']|'')*'", "", sql))
+    return [s for s in strings if s] + numbers
+
+
+def mentions(question: str, literal: str) -> bool:
+    # Numbers must match whole ("5" is not in "15"); strings may be part of a word
+    if re.fullmatch(r"\d+(?:\.\d+)?", literal):
+        return re.search(rf"(?<![\d.]){re.escape(literal)}(?![\d.])", question) is not None
+    return literal in question
+
+
+# Words that flip or change what a question asks for without changing its
+# embedding much ("highest paid" vs "lowest paid"), mapped to one token per meaning
+INTENT_WORDS = {
+    **dict.fromkeys(["highest", "most", "max", "maximum", "top", "largest", "biggest", "greatest", "best"], "max"),
+    **dict.fromkeys(["lowest", "least", "min", "minimum", "bottom", "smallest", "fewest", "worst"], "min"),
+    **dict.fromkeys(["more", "greater", "above", "over", "exceeding"], "gt"),
+    **dict.fromkeys(["less", "fewer", "below", "under"], "lt"),
+    **dict.fromkeys(["first", "earliest", "oldest"], "first"),
+    **dict.fromkeys(["last", "latest", "newest", "recent", "youngest"], "last"),
+    **dict.fromkeys(["before", "after", "between", "since"], None),  # kept as is
+    **dict.fromkeys(["count", "many", "number"], "count"),
+    **dict.fromkeys(["total", "sum"], "sum"),
+    **dict.fromkeys(["average", "avg", "mean"], "avg"),
+    **dict.fromkeys(["not", "no", "without", "except", "never"], "not"),
+}
+
+
+def intent(question: str):
+    """Direction, superlative, aggregate and negation words of a question."""
+    return {INTENT_WORDS[word] or word for word in re.findall(r"[a-z]+", question.lower()) if word in INTENT_WORDS}
+
+
+class LLMCallCounter(BaseCallbackHandler):
+    """Counts model calls made during a run (pass it in the run's callbacks)."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self.calls += 1
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.calls += 1
+
+
+# -------------------------------
+# Question -> validated SQL cache
+# -------------------------------
+class QuestionSQLCache:
+    """Reuses the SQL of an earlier question when a new one is close enough
+    (cosine >= threshold) to it.
+
+    Only SQL that ran successfully is stored, along with the number of LLM
+    calls the agent needed to produce it. That number is what a hit saves.
+    "Who manages Priya Sharma?" and "Who manages Rahul Verma?" embed almost
+    identically, so a match also requires every literal in the stored SQL
+    ('Priya Sharma', 5, ...) to appear in the new question, and the two
+    questions to share their intent words: "highest paid" and "lowest paid"
+    are near-identical embeddings that need opposite SQL. Beyond max_entries
+    the least recently used pairs are dropped. If the question cannot be
+    embedded (API error, timeout), lookup() reports a miss so the agent
+    still answers, and store() is skipped.
+    """
+
+    def __init__(self, embeddings, path="./question_sql.sqlite3", threshold=0.95, max_entries=1000):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.literal_mismatches = 0
+        self.intent_mismatches = 0
+        self.llm_calls_avoided = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS question_sql (
+                id INTEGER PRIMARY KEY,
+                question TEXT NOT NULL UNIQUE,
+                vector BLOB NOT NULL,
+                sql TEXT NOT NULL,
+                llm_calls INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS question_sql_last_used ON question_sql (last_used);
+            """
+        )
+        self._conn.commit()
+
+    def lookup(self, question: str):
+        """Returns (sql or None, question vector or None); pass the vector on
+        to store()."""
+        try:
+            vector = _unit(self.embeddings.embed_query(question))
+        except Exception as e:
+            print(f"⚠ Question embedding failed, asking the agent: {e}")
+            self.errors += 1
+            self.misses += 1
+            return None, None
+        lowered = question.lower()
+        wanted = intent(question)
+        with self._lock:
+            candidates = []
+            for pair_id, stored, blob, sql, llm_calls in self._conn.execute(
+                "SELECT id, question, vector, sql, llm_calls FROM question_sql"
+            ):
+                score = sum(map(mul, vector, array("f", blob)))
+                if score >= self.threshold:
+                    candidates.append((score, pair_id, stored, sql, llm_calls))
+            for score, pair_id, stored, sql, llm_calls in sorted(candidates, reverse=True):
+                if intent(stored) != wanted:
+                    self.intent_mismatches += 1
+                    continue
+                if all(mentions(lowered, literal) for literal in sql_literals(sql)):
+                    self._conn.execute("UPDATE question_sql SET last_used = ? WHERE id = ?", (time.time(), pair_id))
+                    self._conn.commit()
+                    self.hits += 1
+                    self.llm_calls_avoided += llm_calls
+                    return sql, vector
+                self.literal_mismatches += 1
+        self.misses += 1
+        return None, vector
+
+    def store(self, question: str, sql: str, llm_calls: int, vector):
+        if vector is None:
+            return  # lookup() could not embed the question
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO question_sql (question, vector, sql, llm_calls, last_used) VALUES (?, ?, ?, ?, ?)",
+                (question, array("f", vector).tobytes(), sql, llm_calls, time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM question_sql WHERE id IN (SELECT id FROM question_sql ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def forget(self, sql: str):
+        """Drops every pair using sql (e.g. after it stopped working)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM question_sql WHERE sql = ?", (sql,))
+            self._conn.commit()
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return (
+            f"question cache: {self.hits} hits, {self.misses} misses ({rate:.0%}), "
+            f"{self.literal_mismatches} rejected on literals, {self.intent_mismatches} on intent, "
+            f"{self.llm_calls_avoided} LLM calls avoided, "
+            f"{self.errors} embedding errors"
+        )
@@ -0,0 +1,109 @@
+import datetime
+import decimal
+import html
+import pyarrow as pa
+
+EMPTY = "—"
+
+
+def is_id_column(name: str) -> bool:
+    # Keys read better without thousands separators: 10234, not 10,234
+    name = name.lower()
+    return name == "id" or name.endswith(("_id", "year")) or name in ("phone", "pincode")
+
+
+def format_value(value, column="") -> str:
+    """Display text of one cell: thousands separators, two decimals for
+    fractional numbers, readable dates, an em dash for NULL."""
+    if value is None:
+        return EMPTY
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    if isinstance(value, int):
+        return str(value) if is_id_column(column) else f"{value:,}"
+    if isinstance(value, (float, decimal.Decimal)):
+        if value != value:  # NaN
+            return EMPTY
+        return f"{value:,.2f}"
+    if isinstance(value, datetime.datetime):
+        if (value.hour, value.minute, value.second) == (0, 0, 0):
+            return value.strftime("%d %b %Y")
+        return value.strftime("%d %b %Y %H:%M")
+    if isinstance(value, datetime.date):
+        return value.strftime("%d %b %Y")
+    if isinstance(value, datetime.timedelta):
+        # MySQL TIME columns arrive as timedeltas
+        minutes, seconds = divmod(int(value.total_seconds()), 60)
+        return f"{minutes // 60:02d}:{minutes % 60:02d}:{seconds:02d}"
+    if isinstance(value, bytes):
+        return f"<{len(value)} bytes>"
+    return str(value)
+
+
+def is_numeric(data_type) -> bool:
+    return pa.types.is_integer(data_type) or pa.types.is_floating(data_type) or pa.types.is_decimal(data_type)
+
+
+def _rows(result, max_rows):
+    # Column by column: to_pylist() on rows would merge duplicate names
+    table = result.table.slice(0, max_rows)
+    columns = [table.column(i).to_pylist() for i in range(table.num_columns)]
+    for values in zip(*columns):
+        yield [format_value(value, name) for name, value in zip(result.columns, values)]
+
+
+def _footer(result, shown) -> str:
+    if shown >= result.num_rows and not result.truncated:
+        return ""
+    total = f"{result.num_rows:,}+" if result.truncated else f"{result.num_rows:,}"
+    return f"Showing {shown:,} of {total} rows"
+
+
+# -------------------------------
+# Renderers
+# -------------------------------
+def render_markdown(result, max_rows=20) -> str:
+    """GitHub-style Markdown table of the first max_rows rows, numbers
+    right-aligned."""
+    if result.num_rows == 0:
+        return "No results"
+    numeric = [is_numeric(field.type) for field in result.table.schema]
+    cell = lambda text: text.replace("|", "\\|").replace("\n", " ")
+    lines = [
+        "| " + " | ".join(cell(name) for name in result.columns) + " |",
+        "|" + "|".join("---:" if right else "---" for right in numeric) + "|",
+    ]
+    shown = 0
+    for row in _rows(result, max_rows):
+        lines.append("| " + " | ".join(cell(text) for text in row) + " |")
+        shown += 1
+    footer = _footer(result, shown)
+    if footer:
+        lines.append(f"\n_{footer}_")
+    return "\n".join(lines)
+
+
+def render_html(result, max_rows=20, css_class="hr-table") -> str:
+    """HTML table of the first max_rows rows. A single value (a COUNT, an
+    average, one name) is shown as "column: value" instead of a table."""
+    if result.num_rows == 0:
+        return "No results"
+    columns = result.columns
+    if result.num_rows == 1 and len(columns) == 1:
+        value = next(_rows(result, 1))[0]
+        return f"<b>{html.escape(columns[0])}</b>: {html.escape(value)}"
+
+    numeric = [is_numeric(field.type) for field in result.table.schema]
+    align = lambda right: " class='num'" if right else ""
+    parts = [f"<table class='{css_class}'><thead><tr>"]
+    parts += [f"<th{align(right)}>{html.escape(name)}</th>" for name, right in zip(columns, numeric)]
+    parts.append("</tr></thead><tbody>")
+    shown = 0
+    for row in _rows(result, max_rows):
+        parts.append("<tr>" + "".join(f"<td{align(right)}>{html.escape(text)}</td>" for text, right in zip(row, numeric)) + "</tr>")
+        shown += 1
+    parts.append("</tbody></table>")
+    footer = _footer(result, shown)
+    if footer:
+        parts.append(f"<div class='{css_class}-note'>{footer}</div>")
+    return "".join(parts)
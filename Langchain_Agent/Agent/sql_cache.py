@@ -0,0 +1,166 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import bindparam, text as sql_text
+from sql_schema import identifiers
+
+# Per-table change markers from one catalog query. UPDATE_TIME moves on every
+# committed write; TABLE_ROWS catches the cases where it is NULL (e.g. after a
+# server restart). Other dialects hash the table contents instead.
+MARKER_QUERIES = {
+    "mysql": """SELECT table_name, update_time, table_rows FROM information_schema.tables
+                WHERE table_schema = DATABASE() AND table_name IN :tables""",
+}
+
+_STRING_LITERAL = re.compile(r"('(?:[^']|'')*')")
+
+
+def normalize_sql(query: str) -> str:
+    """Case and whitespace outside string literals do not matter, nor does a
+    trailing semicolon: 'select *  from T;' and 'SELECT * FROM t' share a key."""
+    parts = _STRING_LITERAL.split(query.strip().rstrip(";"))
+    return "".join(
+        part if i % 2 else re.sub(r"\s+", " ", part).lower()
+        for i, part in enumerate(parts)
+    ).strip()
+
+
+def result_size(result) -> int:
+    # QueryResult knows its Arrow buffer size; plain strings count characters
+    return result.nbytes if hasattr(result, "nbytes") else len(result)
+
+
+_EXPLAIN_PREFIX = re.compile(r"explain\s+(?:(?:analyze|verbose|extended|query plan|format\s*=\s*\w+|\([^)]*\))\s+)*")
+
+
+def is_read_only(normalized: str) -> bool:
+    # EXPLAIN ANALYZE runs the statement: it is only as read-only as what it explains
+    explain = _EXPLAIN_PREFIX.match(normalized)
+    if explain:
+        return is_read_only(normalized[explain.end():])
+    return normalized.startswith(("select ", "with ", "show ", "describe "))
+
+
+def _content_hash(conn, quoted_table) -> str:
+    # Reads the whole table: meant for small tables and local stand-ins
+    digest = hashlib.sha256()
+    for row in conn.execute(sql_text(f"SELECT * FROM {quoted_table}")):
+        digest.update(repr(tuple(row)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def table_markers(engine, tables) -> dict:
+    tables = sorted(tables)
+    if not tables:
+        return {}
+    query = MARKER_QUERIES.get(engine.dialect.name)
+    with engine.connect() as conn:
+        if query is not None:
+            dialect = engine.dialect
+            if not getattr(dialect, "is_mariadb", False) and (dialect.server_version_info or (0,)) >= (8,):
+                # MySQL 8 caches these columns for a day by default
+                conn.execute(sql_text("SET SESSION information_schema_stats_expiry = 0"))
+            rows = conn.execute(sql_text(query).bindparams(bindparam("tables", expanding=True)), {"tables": tables})
+            return {name: (str(updated), row_count) for name, updated, row_count in rows}
+        quote = engine.dialect.identifier_preparer.quote
+        return {table: _content_hash(conn, quote(table)) for table in tables}
+
+
+# -------------------------------
+# SQL result cache
+# -------------------------------
+class SQLResultCache:
+    """In-memory results of read-only queries, keyed by normalized SQL.
+
+    An entry is never served after ttl seconds. Before that, the change
+    markers of the tables it reads are compared with the ones taken when it
+    was stored (at most once per marker_interval per entry), and any
+    difference drops it. Beyond max_bytes of cached results the least
+    recently used entries are evicted.
+    """
+
+    def __init__(self, engine, schema_cache, ttl=300, marker_interval=15, max_bytes=32 << 20):
+        self.engine = engine
+        self.schema_cache = schema_cache
+        self.ttl = ttl
+        self.marker_interval = marker_interval
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._bytes = 0
+        self._entries = OrderedDict()  # key -> [result, stored_at, checked_at, tables, markers]
+        self._lock = threading.Lock()
+
+    def tables_in(self, normalized: str):
+        known = {table.lower(): table for table in self.schema_cache.table_names()}
+        return sorted(known[word] for word in identifiers(normalized) if word in known)
+
+    def _drop(self, key):
+        self._bytes -= result_size(self._entries.pop(key)[0])
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            now = time.monotonic()
+            if now - entry[1] >= self.ttl:
+                self._drop(key)
+                return None
+            needs_check = now - entry[2] >= self.marker_interval
+        if needs_check:
+            markers = table_markers(self.engine, entry[3])
+            with self._lock:
+                if markers != entry[4]:
+                    self.invalidations += 1
+                    if key in self._entries:
+                        self._drop(key)
+                    return None
+                entry[2] = time.monotonic()
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return entry[0]
+
+    def run(self, query: str, execute):
+        """Returns execute(query) (a QueryResult, or a string like
+        SQLDatabase.run returns), served from the cache when still valid. Only read-only statements are cached;
+        errors propagate uncached."""
+        key = normalize_sql(query)
+        if not is_read_only(key):
+            return execute(query)
+        result = self._lookup(key)
+        if result is not None:
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        tables = self.tables_in(key)
+        # Markers first: a write landing during execute then invalidates the entry
+        markers = table_markers(self.engine, tables)
+        result = execute(query)
+        now = time.monotonic()
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = [result, now, now, tables, markers]
+            self._bytes += result_size(result)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                self._drop(next(iter(self._entries)))
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return (
+            f"sql cache: {self.hits} hits, {self.misses} misses ({rate:.0%}), "
+            f"{self.invalidations} invalidated, {len(self._entries)} entries / {self._bytes >> 10} KiB"
+        )
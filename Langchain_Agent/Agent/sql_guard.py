@@ -0,0 +1,209 @@
+import difflib
+import math
+import threading
+import time
+from collections import defaultdict
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import OptimizeError, SqlglotError
+from sqlglot.optimizer.qualify import qualify
+from sqlalchemy import text as sql_text
+
+# SQLAlchemy dialect name -> sqlglot dialect name, where they differ
+SQLGLOT_DIALECTS = {"postgresql": "postgres", "mssql": "tsql"}
+
+# Functions that wait, lock or read files: never needed to answer an HR question
+BLOCKED_FUNCTIONS = {"sleep", "benchmark", "load_file", "get_lock", "release_lock", "pg_sleep"}
+
+# Catalog schemas the agent may read without them being in the schema cache
+CATALOG_SCHEMAS = {"information_schema"}
+
+
+class SQLRejected(ValueError):
+    """SQL refused before it reached the database. The message says why, in
+    words the agent can act on."""
+
+
+def _sqlite_plan(conn, sql, aliases, table_rows):
+    # EXPLAIN QUERY PLAN rows are (id, parent, notused, detail); "SCAN x" is a
+    # full scan of table or alias x, "SEARCH x USING ..." an index lookup
+    for _, parent, _, detail in conn.execute(sql_text(f"EXPLAIN QUERY PLAN {sql}")):
+        verb, _, rest = detail.partition(" ")
+        if verb not in ("SCAN", "SEARCH"):
+            continue
+        table = aliases.get(rest.split(" ")[0].lower())
+        rows = table_rows(table) if table else 1
+        if verb == "SEARCH":
+            rows = 1 if "PRIMARY KEY" in rest else max(1, rows // 10)
+        yield parent, table or rest.split(" ")[0], rows, verb == "SCAN"
+
+
+def _mysql_plan(conn, sql, aliases, table_rows):
+    # Tabular EXPLAIN: one row per table and select id; type ALL (or index)
+    # reads the whole table, rows is MySQL's estimate per lookup
+    for row in conn.execute(sql_text(f"EXPLAIN {sql}")).mappings():
+        table = row.get("table") or ""
+        yield row.get("id"), aliases.get(table.lower(), table), int(row.get("rows") or 1), row.get("type") in ("ALL", "index")
+
+
+PLAN_READERS = {"sqlite": _sqlite_plan, "mysql": _mysql_plan}
+
+
+# -------------------------------
+# Pre-execution SQL validation
+# -------------------------------
+class SQLGuard:
+    """Checks agent SQL locally before it runs, and returns the SQL to run.
+
+    - It must parse, be a single statement, and only read (SELECT / WITH /
+      SHOW / DESCRIBE / a parsed EXPLAIN of a read, no locking reads or
+      blocked functions).
+    - Tables and columns must exist in the cached schema. Queries reading
+      only information_schema get just the read-only check and a LIMIT; when
+      they also read HR tables, qualified HR columns are still checked.
+    - A query without LIMIT gets LIMIT max_rows + 1 (one more than is kept,
+      so truncation can still be detected).
+    - The EXPLAIN plan's estimate of rows examined (tables joined in one
+      select multiply, separate selects add up) must stay under
+      max_rows_examined; this catches cross joins and big full scans.
+      Plans are read for MySQL and SQLite; other dialects skip this check.
+    """
+
+    def __init__(self, engine, schema_cache, max_rows=5000, max_rows_examined=1_000_000, stats_ttl=300):
+        self.engine = engine
+        self.schema_cache = schema_cache
+        self.dialect = SQLGLOT_DIALECTS.get(engine.dialect.name, engine.dialect.name)
+        self.max_rows = max_rows
+        self.max_rows_examined = max_rows_examined
+        self.stats_ttl = stats_ttl
+        self.checked = 0
+        self.limits_added = 0
+        self.rejected = defaultdict(int)
+        self._row_counts = {}  # table -> (rows, counted_at), for plans without estimates
+        self._lock = threading.Lock()
+
+    def _reject(self, reason, message):
+        with self._lock:
+            self.rejected[reason] += 1
+        raise SQLRejected(message)
+
+    def check(self, sql: str) -> str:
+        """Returns sql, with a LIMIT added if it had none; raises SQLRejected."""
+        with self._lock:
+            self.checked += 1
+        try:
+            statements = [tree for tree in sqlglot.parse(sql, read=self.dialect) if tree is not None]
+        except SqlglotError as e:
+            self._reject("syntax", f"SQL syntax error: {str(e).splitlines()[0]}")
+        if len(statements) != 1:
+            self._reject("syntax", "Send exactly one SQL statement.")
+        tree = statements[0]
+
+        self._check_read_only(tree)
+        if not isinstance(tree, exp.Query):
+            return sql  # SHOW / DESCRIBE / EXPLAIN: nothing to limit or plan
+        # Catalog reads (how an agent finds tables on MySQL) are metadata
+        # lookups: their columns are not in the cached schema, and there is
+        # no table plan worth reading. A query that also reads HR tables is
+        # still planned and costed.
+        in_catalog = [table.db.lower() in CATALOG_SCHEMAS for table in tree.find_all(exp.Table)]
+        catalog_only = bool(in_catalog) and all(in_catalog)
+        aliases = self._check_names(tree, check_columns=not catalog_only, strict=not any(in_catalog))
+
+        sql = sql.strip().rstrip(";").strip()
+        if tree.args.get("limit") is None:
+            # On its own line, so a trailing -- comment cannot swallow it
+            sql = f"{sql}\nLIMIT {self.max_rows + 1}"
+            with self._lock:
+                self.limits_added += 1
+        if not catalog_only:
+            self._check_cost(sql, aliases)
+        return sql
+
+    def _check_read_only(self, tree):
+        # An EXPLAIN sqlglot cannot parse stays opaque text, and EXPLAIN ANALYZE
+        # runs what it explains, so only parsed ones (checked below) get through
+        if isinstance(tree, exp.Command) and str(tree.this).upper() == "EXPLAIN":
+            self._reject("write", "Send the query itself, not an EXPLAIN of it; it is planned before it runs.")
+        allowed = isinstance(tree, (exp.Query, exp.Describe, exp.Show)) or (
+            isinstance(tree, exp.Command) and str(tree.this).upper() in ("SHOW", "DESCRIBE", "DESC")
+        )
+        if not allowed or tree.find(exp.DML, exp.DDL) is not None:
+            self._reject("write", "Only read-only queries (SELECT, SHOW, DESCRIBE) are allowed.")
+        if any(select.args.get("locks") for select in tree.find_all(exp.Select)):
+            self._reject("write", "Locking reads (FOR UPDATE / FOR SHARE) are not allowed.")
+        for function in tree.find_all(exp.Anonymous):
+            if str(function.this).lower() in BLOCKED_FUNCTIONS:
+                self._reject("write", f"Function {function.this}() is not allowed.")
+
+    def _check_names(self, tree, check_columns=True, strict=True):
+        """Validates table (and column) names; returns {alias or name: table}.
+        Without strict, unqualified columns that may belong to a table outside
+        the cached schema are let through."""
+        known = {table.lower(): table for table in self.schema_cache.table_names()}
+        ctes = {cte.alias.lower() for cte in tree.find_all(exp.CTE)}
+        aliases = {}
+        for table in tree.find_all(exp.Table):
+            name = table.name.lower()
+            if table.db.lower() in CATALOG_SCHEMAS or (not table.db and name in ctes):
+                continue
+            if name not in known:
+                close = difflib.get_close_matches(name, known, n=1, cutoff=0.6)
+                hint = f" Did you mean '{known[close[0]]}'?" if close else ""
+                self._reject("names", f"Unknown table '{table.name}'.{hint} Tables: {', '.join(sorted(known.values()))}")
+            aliases[name] = known[name]
+            if table.alias:
+                aliases[table.alias.lower()] = known[name]
+        if not check_columns:
+            return aliases
+
+        # MySQL compares column names case-insensitively: lower-case a copy,
+        # then let sqlglot resolve every column through aliases, CTEs and
+        # subqueries against the cached schema
+        copy = tree.copy()
+        for identifier in copy.find_all(exp.Identifier):
+            identifier.set("this", identifier.this.lower())
+        schema = {name: {column: "TEXT" for column in self.schema_cache.columns(table)} for name, table in known.items()}
+        try:
+            qualify(copy, schema=schema, dialect=self.dialect, validate_qualify_columns=strict)
+        except OptimizeError as e:
+            tables = sorted(set(aliases.values()))
+            self._reject("names", f"{e}. Columns: {self.schema_cache.describe(tables)}")
+        return aliases
+
+    def _table_rows(self, table):
+        with self._lock:
+            rows, counted_at = self._row_counts.get(table, (0, -math.inf))
+        if time.monotonic() - counted_at >= self.stats_ttl:
+            quote = self.engine.dialect.identifier_preparer.quote
+            with self.engine.connect() as conn:
+                rows = conn.execute(sql_text(f"SELECT COUNT(*) FROM {quote(table)}")).scalar()
+            with self._lock:
+                self._row_counts[table] = (rows, time.monotonic())
+        return rows
+
+    def _check_cost(self, sql, aliases):
+        read_plan = PLAN_READERS.get(self.engine.dialect.name)
+        if read_plan is None:
+            return
+        groups = defaultdict(list)  # select (or SQLite loop level) -> [(table, rows, full_scan)]
+        with self.engine.connect() as conn:
+            for group, table, rows, full_scan in read_plan(conn, sql, aliases, self._table_rows):
+                groups[group].append((table, rows, full_scan))
+        examined = sum(math.prod(rows for _, rows, _ in loops) for loops in groups.values())
+        if examined <= self.max_rows_examined:
+            return
+        scans = sorted({table for loops in groups.values() for table, _, full_scan in loops if full_scan})
+        cross = [loops for loops in groups.values() if sum(full_scan for _, _, full_scan in loops) > 1]
+        detail = f"full scan of {', '.join(scans)}" if scans else "large index range"
+        if cross:
+            detail += " joined without a usable join condition"
+        self._reject(
+            "cost",
+            f"Query too expensive: about {examined:,} rows examined ({detail}; limit {self.max_rows_examined:,}). "
+            "Join on key columns and filter with WHERE before retrying.",
+        )
+
+    def summary(self) -> str:
+        rejected = ", ".join(f"{count} {reason}" for reason, count in sorted(self.rejected.items())) or "none"
+        return f"sql guard: {self.checked} checked, {self.limits_added} limits added, rejected: {rejected}"
@@ -0,0 +1,117 @@
+import time
+import pyarrow as pa
+from sqlalchemy import text as sql_text
+
+
+def approx_token_counter(text: str) -> int:
+    # Roughly 4 characters per token for English text, rounded up
+    return max(1, -(-len(text) // 4))
+
+
+def _column(values):
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        # Mixed or exotic types: keep the text, not the query
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+# -------------------------------
+# Columnar query result
+# -------------------------------
+class QueryResult:
+    """Rows of one query as an Arrow table, capped at the row limit it was
+    fetched with (truncated tells whether more rows existed).
+
+    str() gives a token-bounded text preview, so the object can be returned
+    from a tool: the agent sees the preview, the UI gets the table.
+    """
+
+    def __init__(self, sql: str, table: pa.Table, truncated=False, seconds=0.0):
+        self.sql = sql
+        self.table = table
+        self.truncated = truncated
+        self.seconds = seconds
+
+    @property
+    def num_rows(self) -> int:
+        return self.table.num_rows
+
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes
+
+    @property
+    def columns(self):
+        return self.table.column_names
+
+    def page(self, number: int, page_size=50) -> pa.Table:
+        """Rows of 0-based page `number`."""
+        return self.table.slice(number * page_size, page_size)
+
+    def page_count(self, page_size=50) -> int:
+        return max(1, -(-self.num_rows // page_size))
+
+    def preview(self, max_tokens=600, count_tokens=approx_token_counter, max_cell=60) -> str:
+        """Pipe-separated header and rows, stopping before max_tokens."""
+        if self.num_rows == 0:
+            return "No results"
+        header = " | ".join(self.columns)
+        lines = [header]
+        used = count_tokens(header + "\n")
+        shown = 0
+        # Column by column (to_pylist() on rows would merge duplicate names
+        # such as e.name, d.name), over at most max_tokens rows: each row
+        # costs at least one token
+        head = self.table.slice(0, max_tokens)
+        columns = [head.column(i).to_pylist() for i in range(head.num_columns)]
+        for row in zip(*columns):
+            cells = []
+            for value in row:
+                cell = "" if value is None else str(value)
+                cells.append(cell if len(cell) <= max_cell else cell[: max_cell - 1] + "…")
+            line = " | ".join(cells)
+            used += count_tokens(line + "\n")
+            if used > max_tokens and shown:
+                break
+            lines.append(line)
+            shown += 1
+        total = f"{self.num_rows}+" if self.truncated else str(self.num_rows)
+        if shown < self.num_rows or self.truncated:
+            lines.append(f"... showing {shown} of {total} rows")
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.preview()
+
+    def __len__(self):
+        return self.num_rows
+
+
+def run_query(engine, sql: str, max_rows=5000, batch_size=1000) -> QueryResult:
+    """Runs sql on a server-side cursor and keeps at most max_rows rows, read
+    batch_size at a time, as columns."""
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, max_row_buffer=batch_size).execute(sql_text(sql))
+        if not result.returns_rows:
+            conn.commit()
+            return QueryResult(sql, pa.table({}), seconds=time.perf_counter() - start)
+        columns = list(result.keys())
+        rows = []
+        while len(rows) <= max_rows:
+            batch = result.fetchmany(min(batch_size, max_rows + 1 - len(rows)))
+            if not batch:
+                break
+            rows.extend(batch)
+        truncated = len(rows) > max_rows
+        if truncated:
+            # Closing a streamed result reads (and discards) every remaining
+            # row; dropping the connection stops the query instead
+            conn.invalidate()
+        else:
+            result.close()
+    rows = rows[:max_rows]
+    # from_arrays keeps duplicate names (e.g. two "name" columns from a join)
+    table = pa.Table.from_arrays([_column([row[i] for row in rows]) for i in range(len(columns))], names=columns)
+    return QueryResult(sql, table, truncated, time.perf_counter() - start)
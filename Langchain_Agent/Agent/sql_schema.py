@@ -0,0 +1,150 @@
+import difflib
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from sqlalchemy import inspect, text as sql_text
+
+# Catalog queries whose output changes whenever a table or column is created,
+# dropped, renamed or retyped. Much cheaper than reflecting the schema.
+FINGERPRINT_QUERIES = {
+    "mysql": """SELECT table_name, column_name, column_type, ordinal_position
+                FROM information_schema.columns WHERE table_schema = DATABASE()
+                ORDER BY table_name, ordinal_position""",
+    "postgresql": """SELECT table_name, column_name, data_type, ordinal_position
+                     FROM information_schema.columns WHERE table_schema = current_schema()
+                     ORDER BY table_name, ordinal_position""",
+    "sqlite": "SELECT name, sql FROM sqlite_master WHERE type IN ('table', 'view') ORDER BY name",
+}
+
+
+def identifiers(text: str):
+    return set(re.findall(r"[a-z_][a-z0-9_]*", text.lower()))
+
+
+def ddl_fingerprint(engine) -> str:
+    query = FINGERPRINT_QUERIES.get(engine.dialect.name)
+    if query is None:
+        # Unknown dialect: fall back to (slower) reflection of names and types
+        inspector = inspect(engine)
+        rows = [
+            (table, column["name"], str(column["type"]))
+            for table in sorted(inspector.get_table_names())
+            for column in inspector.get_columns(table)
+        ]
+    else:
+        with engine.connect() as conn:
+            rows = [tuple(map(str, row)) for row in conn.execute(sql_text(query))]
+    return hashlib.sha256(json.dumps(rows).encode("utf-8")).hexdigest()
+
+
+# -------------------------------
+# Schema introspection cache
+# -------------------------------
+class SchemaCache:
+    """Compact, precomputed table descriptions for SQL correction prompts.
+
+    The schema is reflected once and saved to path together with a DDL
+    fingerprint. A new process, or a call after check_interval seconds,
+    only recomputes the fingerprint and reflects again if it changed.
+    invalidate() forces a check on the next call.
+
+    Each table is described on one line, without sample rows:
+    employees(id int PK, name varchar(100), department_id int -> departments.id)
+    """
+
+    def __init__(self, engine, path="./schema_cache.json", check_interval=60):
+        self.engine = engine
+        self.path = path
+        self.check_interval = check_interval
+        self.refreshes = 0
+        self._lock = threading.Lock()
+        self._checked = 0.0
+        self._schema = None
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                self._schema = json.load(file)
+
+    def invalidate(self):
+        with self._lock:
+            self._checked = 0.0
+
+    def _current(self):
+        with self._lock:
+            if time.monotonic() - self._checked >= self.check_interval or self._schema is None:
+                fingerprint = ddl_fingerprint(self.engine)
+                if self._schema is None or self._schema["fingerprint"] != fingerprint:
+                    self._schema = self._reflect(fingerprint)
+                    self._save()
+                self._checked = time.monotonic()
+            return self._schema
+
+    def _reflect(self, fingerprint):
+        self.refreshes += 1
+        inspector = inspect(self.engine)
+        tables = {}
+        for table in inspector.get_table_names():
+            primary_key = set(inspector.get_pk_constraint(table).get("constrained_columns") or [])
+            references = {}
+            for fk in inspector.get_foreign_keys(table):
+                for column, target in zip(fk["constrained_columns"], fk["referred_columns"]):
+                    references[column] = f"{fk['referred_table']}.{target}"
+            reflected = inspector.get_columns(table)
+            columns = []
+            for column in reflected:
+                entry = f"{column['name']} {str(column['type']).lower()}"
+                if column["name"] in primary_key:
+                    entry += " PK"
+                if column["name"] in references:
+                    entry += f" -> {references[column['name']]}"
+                columns.append(entry)
+            tables[table] = {
+                "description": f"{table}({', '.join(columns)})",
+                "columns": [column["name"].lower() for column in reflected],
+                "references": sorted({target.split(".")[0] for target in references.values()}),
+            }
+        return {"fingerprint": fingerprint, "tables": tables}
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self._schema, file)
+        os.replace(tmp_path, self.path)
+
+    def table_names(self):
+        return list(self._current()["tables"])
+
+    def columns(self, table: str):
+        return self._current()["tables"][table]["columns"]
+
+    def describe(self, tables=None) -> str:
+        schema = self._current()["tables"]
+        return "\n".join(schema[table]["description"] for table in (tables or schema) if table in schema)
+
+    def relevant_tables(self, text: str, k=4):
+        """Tables a query (plus its error message) is probably about: names it
+        mentions, near-misses such as 'employee' for 'employees', tables owning
+        its column names, then their foreign-key neighbours for joins."""
+        schema = self._current()["tables"]
+        words = identifiers(text)
+        lowered = {table.lower(): table for table in schema}
+        scores = {}
+        for word in words:
+            if word in lowered:
+                scores[lowered[word]] = scores.get(lowered[word], 0) + 10
+                continue
+            for match in difflib.get_close_matches(word, lowered, n=1, cutoff=0.8):
+                scores[lowered[match]] = scores.get(lowered[match], 0) + 5
+        for table, info in schema.items():
+            hits = len(words.intersection(info["columns"]))
+            if hits:
+                scores[table] = scores.get(table, 0) + hits
+
+        chosen = sorted(scores, key=lambda table: -scores[table])[:k]
+        for table in list(chosen):
+            for neighbour in schema[table]["references"]:
+                if neighbour not in chosen and len(chosen) < k:
+                    chosen.append(neighbour)
+        return chosen
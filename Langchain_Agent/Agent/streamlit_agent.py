@@ -2,15 +2,18 @@ import streamlit as st
 from langchain_openai import ChatOpenAI
 from langchain_core.tools import tool
 from langchain_community.tools import DuckDuckGoSearchRun
-from langchain import hub
 from dotenv import load_dotenv
 from langchain.agents import create_react_agent, AgentExecutor
 from langchain_community.utilities import WikipediaAPIWrapper
 from langchain.tools.wikipedia.tool import WikipediaQueryRun
 import os
-import requests
 from datetime import datetime
-import time
+from parallel_tools import parallel_travel_answer, travel_tool_calls
+from plan_execute import plan_and_execute
+from weather_client import WeatherClient, weather_from_steps
+from tool_cache import CachedTool, ToolResultCache
+from local_wiki import LocalWikipedia, LocalWikipediaQueryRun
+from prompt_registry import load_prompt
 
 # Load environment variables
 load_dotenv()
@@ -99,18 +102,21 @@ st.markdown("""
     </div>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def load_tool_cache():
+    return ToolResultCache()
+
 # Initialize tools with caching
 @st.cache_resource
 def load_tools():
+    # Pooled session + per-location cache, shared by every session of the app
+    weather_client = WeatherClient()
+
     @tool
     def get_weather(location: str) -> dict:
         """Fetches current weather data for a specified location using WeatherAPI."""
-        WEATHER_API_KEY = os.getenv("WEATHERAPI_KEY")
-        url = f"http://api.weatherapi.com/v1/current.json?key={WEATHER_API_KEY}&q={location}"
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            weather_data = response.json()
+            weather_data = weather_client.current(location)
             icon_url = f"https:{weather_data['current']['condition']['icon']}"
             return {
                 "location": f"{weather_data['location']['name']}, {weather_data['location']['country']}",
@@ -130,8 +136,14 @@ def load_tools():
         """Returns the current date and time."""
         return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-    search_tool = DuckDuckGoSearchRun()
-    wikipedia = WikipediaQueryRun(api_wrapper=WikipediaAPIWrapper())
+    # Popular destinations come up again and again; answer repeats from disk
+    tool_cache = load_tool_cache()
+    search_tool = CachedTool(DuckDuckGoSearchRun(), tool_cache)
+    # WIKIPEDIA_INDEX points at an index built with local_wiki.py: no network needed
+    if os.getenv("WIKIPEDIA_INDEX"):
+        wikipedia = LocalWikipediaQueryRun(index=LocalWikipedia(os.getenv("WIKIPEDIA_INDEX")))
+    else:
+        wikipedia = CachedTool(WikipediaQueryRun(api_wrapper=WikipediaAPIWrapper()), tool_cache)
     
     return {
         "Web Search": search_tool,
@@ -148,13 +160,28 @@ def load_llm():
         temperature=0.7
     )
 
-# Loading animation
-def show_loading_animation():
-    placeholder = st.empty()
-    for i in range(3):
-        placeholder.markdown(f"🌍 Gathering information{'.'*(i+1)}")
-        time.sleep(0.5)
-    placeholder.empty()
+# One ReAct agent/executor per process; AgentExecutor keeps no per-request state
+@st.cache_resource
+def load_agent_executor():
+    tools = list(load_tools().values())
+    agent = create_react_agent(
+        llm=load_llm(),
+        tools=tools,
+        prompt=load_prompt("hwchase17/react")  # vendored copy, no hub round trip
+    )
+    return AgentExecutor(
+        agent=agent,
+        tools=tools,
+        verbose=False,
+        handle_parsing_errors=True,
+        max_iterations=10,  # Increased from default 5
+        max_execution_time=30,  # 30 seconds max
+        early_stopping_method="generate",  # Better handling of long processes
+        return_intermediate_steps=True  # Lets the weather card reuse the agent's lookup
+    )
+
+# Warm-up: build tools, LLM client and agent when the app starts, not on the first submit
+load_agent_executor()
 
 # Main app function
 def main():
@@ -167,18 +194,21 @@ def main():
             placeholder="Enter a city or destination",
             help="Example: Mawsynram, Meghalaya"
         )
+        mode = st.radio(
+            "Agent mode",
+            ["ReAct", "Parallel tools", "Plan & execute"],
+            horizontal=True,
+            help="Parallel tools runs weather, Wikipedia and search at once, then makes a single LLM call. "
+                 "Plan & execute makes one planning call, runs the planned tools in parallel, then one answer call"
+        )
         submit_button = st.form_submit_button(label="Get Travel Info")
 
     if submit_button and location:
         with st.spinner("🌍 Gathering travel information..."):
             try:
-                # Show loading animation
-                show_loading_animation()
-                
-                # Load tools and LLM
+                # Load tools and LLM (already built by the warm-up)
                 tools = load_tools()
                 llm = load_llm()
-                react_prompt = hub.pull("hwchase17/react")
                 
                 # Compact tools display
                 st.markdown("### 🛠️ Tools Being Used")
@@ -186,36 +216,29 @@ def main():
                 st.markdown(tools_html, unsafe_allow_html=True)
                 st.markdown("---")
                 
-                # Create agent
-                agent = create_react_agent(
-                    llm=llm,
-                    tools=list(tools.values()),
-                    prompt=react_prompt
+                question = (
+                    f"Provide detailed information about visiting {location}. "
+                    f"Include: 1) Current weather conditions, 2) Top attractions from Wikipedia, "
+                    f"3) Best time to visit based on climate, and 4) Any travel tips."
                 )
-                agent_executor = AgentExecutor(
-                        agent=agent,
-                        tools=list(tools.values()),
-                        verbose=False,
-                        handle_parsing_errors=True,
-                        max_iterations=10,  # Increased from default 5
-                        max_execution_time=30,  # 30 seconds max
-                        early_stopping_method="generate"  # Better handling of long processes
-                    )
 
-                # Execute agent
-                response = agent_executor.invoke({
-                    "input": (
-                        f"Provide detailed information about visiting {location}. "
-                        f"Include: 1) Current weather conditions, 2) Top attractions from Wikipedia, "
-                        f"3) Best time to visit based on climate, and 4) Any travel tips."
-                    )
-                })
+                if mode == "Parallel tools":
+                    # All tool calls at once (with per-tool timeouts), one LLM call
+                    response = parallel_travel_answer(llm, tools, location, question)
+                elif mode == "Plan & execute":
+                    # One planning call, the plan's tools as a DAG, one answer call
+                    response = plan_and_execute(llm, tools, question, fallback_calls=travel_tool_calls(location))
+                else:
+                    # Execute agent
+                    response = load_agent_executor().invoke({"input": question})
 
                 # Display results with animation
                 st.success("✅ Here's your comprehensive travel guide!")
                 
-                # Weather card
-                weather_data = tools["Weather API"](location)
+                # Weather card: reuse the agent's own lookup; otherwise the client cache answers
+                weather_data = weather_from_steps(response.get("intermediate_steps", []))
+                if weather_data is None:
+                    weather_data = tools["Weather API"].invoke(location)
                 if "error" not in weather_data:
                     st.markdown("### 🌤️ Current Weather")
                     col1, col2 = st.columns([1, 3])
@@ -253,6 +276,7 @@ def main():
                         st.error(f"Error displaying results: {str(e)}")
                 else:
                     st.warning("No travel information was generated")
+                st.caption(load_tool_cache().summary())
 
             except Exception as e:
                 st.error(f"An error occurred: {str(e)}")
@@ -0,0 +1,22 @@
+import asyncio
+from langchain_core.tools import tool
+from parallel_tools import run_tool_calls
+
+
+@tool
+async def wait(seconds: float) -> str:
+    """Sleeps for seconds."""
+    await asyncio.sleep(seconds)
+    return f"waited {seconds}"
+
+
+def test_repeated_tool_keeps_every_duration():
+    steps, durations = run_tool_calls({"Wait": wait}, [("Wait", {"seconds": 0.2}), ("Wait", {"seconds": 0.01})])
+    assert [observation for _, observation in steps] == ["waited 0.2", "waited 0.01"]
+    assert [name for name, _ in durations] == ["Wait", "Wait"]
+    assert durations[0][1] >= 0.2 > durations[1][1]
+
+
+def test_timeout_becomes_an_observation():
+    steps, _ = run_tool_calls({"Wait": wait}, [("Wait", {"seconds": 1})], timeouts={"Wait": 0.05})
+    assert steps[0][1] == "Error: timed out after 0.05s"
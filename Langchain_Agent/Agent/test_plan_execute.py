@@ -0,0 +1,63 @@
+import json
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.tools import tool
+from plan_execute import parse_plan, plan_and_execute
+
+TOOLS = {"Weather API": object(), "Wikipedia": object()}
+
+
+def plan(steps):
+    return json.dumps({"steps": steps})
+
+
+def test_parses_steps_with_defaults():
+    steps = parse_plan("Plan:\n" + plan([
+        {"id": "s1", "tool": "Wikipedia", "input": "Mawsynram"},
+        {"id": "s2", "tool": "Weather API", "input": "{s1}", "depends_on": ["s1"]},
+    ]), TOOLS)
+    assert [step["depends_on"] for step in steps] == [[], ["s1"]]
+
+
+@pytest.mark.parametrize("reply", [
+    "no json here",
+    '{"steps": ',
+    json.dumps({"plan": []}),
+    plan([]),
+    json.dumps({"steps": {"id": "s1"}}),
+    plan(["Weather API"]),
+    plan([{"tool": "Weather API"}]),
+    plan([{"id": 1, "tool": "Weather API"}]),
+    plan([{"id": "s1", "tool": "Weather API", "depends_on": "s0"}]),
+    plan([{"id": "s1", "tool": "Weather API", "depends_on": [{"id": "s0"}]}]),
+    plan([{"id": "s1", "tool": "Search"}]),
+    plan([{"id": "s1", "tool": "Wikipedia"}, {"id": "s1", "tool": "Wikipedia"}]),
+    plan([{"id": "s1", "tool": "Wikipedia", "depends_on": ["s9"]}]),
+    plan([{"id": "s1", "tool": "Wikipedia", "depends_on": ["s2"]},
+          {"id": "s2", "tool": "Wikipedia", "depends_on": ["s1"]}]),
+])
+def test_malformed_plans_raise_value_error(reply):
+    with pytest.raises(ValueError):
+        parse_plan(reply, TOOLS)
+
+
+@tool
+def wikipedia(query: str) -> str:
+    """Stub Wikipedia lookup."""
+    return f"Article about {query}"
+
+
+class DownChatModel(FakeListChatModel):
+    def _call(self, *args, **kwargs):
+        raise TimeoutError("model timed out")
+
+
+def test_counts_the_llm_calls_made():
+    tools = {"Wikipedia": wikipedia}
+    reply = plan([{"id": "s1", "tool": "Wikipedia", "input": "Mawsynram"}])
+    response = plan_and_execute(FakeListChatModel(responses=[reply, "It rains a lot."]), tools, "Tell me about Mawsynram")
+    assert (response["output"], response["llm_calls"]) == ("It rains a lot.", 2)
+    assert response["intermediate_steps"][0][1] == "Article about Mawsynram"
+    # Each call fails over to a second model: four calls, not two
+    llm = DownChatModel(responses=[""]).with_fallbacks([FakeListChatModel(responses=[reply, "It rains a lot."])])
+    assert plan_and_execute(llm, tools, "Tell me about Mawsynram")["llm_calls"] == 4
@@ -0,0 +1,55 @@
+from question_sql_cache import QuestionSQLCache, intent
+
+
+class KeywordEmbeddings:
+    """Embeds a question as counts of a few keywords; fails when told to."""
+
+    words = ["manages", "salary", "leave", "priya", "rahul"]
+
+    def __init__(self):
+        self.down = False
+
+    def embed_query(self, text):
+        if self.down:
+            raise TimeoutError("embedding request timed out")
+        text = text.lower()
+        return [float(text.count(word)) + 0.01 for word in self.words]
+
+
+def test_reuses_sql_only_when_literals_match(tmp_path):
+    cache = QuestionSQLCache(KeywordEmbeddings(), path=str(tmp_path / "q.sqlite3"))
+    sql, vector = cache.lookup("Who manages Priya?")
+    assert sql is None
+    cache.store("Who manages Priya?", "SELECT manager FROM employees WHERE name = 'Priya'", 3, vector)
+    assert cache.lookup("who manages priya")[0] == "SELECT manager FROM employees WHERE name = 'Priya'"
+    assert cache.llm_calls_avoided == 3
+
+
+def test_embedding_failure_is_a_miss_and_skips_store(tmp_path):
+    embeddings = KeywordEmbeddings()
+    cache = QuestionSQLCache(embeddings, path=str(tmp_path / "q.sqlite3"))
+    embeddings.down = True
+    sql, vector = cache.lookup("Who manages Priya?")
+    assert (sql, vector) == (None, None)
+    assert (cache.misses, cache.errors) == (1, 1)
+    cache.store("Who manages Priya?", "SELECT 1", 3, vector)
+    embeddings.down = False
+    assert cache.lookup("Who manages Priya?")[0] is None
+
+
+def test_opposite_questions_without_literals_do_not_share_sql(tmp_path):
+    # KeywordEmbeddings ignores "highest"/"lowest": the two embed identically
+    cache = QuestionSQLCache(KeywordEmbeddings(), path=str(tmp_path / "q.sqlite3"))
+    sql, vector = cache.lookup("Who is the highest paid employee by salary?")
+    cache.store("Who is the highest paid employee by salary?",
+                "SELECT name FROM employees ORDER BY salary DESC", 3, vector)
+    assert cache.lookup("Who is the lowest paid employee by salary?")[0] is None
+    assert cache.intent_mismatches == 1
+    # A synonym of the same intent still reuses the SQL
+    assert cache.lookup("Who is the top paid employee by salary?")[0] is not None
+
+
+def test_intent_words():
+    assert intent("Who earns the most?") == intent("Which employee has the maximum salary") == {"max"}
+    assert intent("How many employees joined after 2020?") == {"count", "after"}
+    assert intent("Employees without a manager") == {"not"}
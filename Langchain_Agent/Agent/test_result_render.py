@@ -0,0 +1,42 @@
+import datetime
+import decimal
+import pyarrow as pa
+from result_render import format_value, is_id_column, render_html, render_markdown
+from sql_results import QueryResult
+
+
+def test_format_value():
+    assert format_value(1234567, "salary") == "1,234,567"
+    assert format_value(10234, "employee_id") == "10234"
+    assert format_value(decimal.Decimal("55000.5")) == "55,000.50"
+    assert format_value(float("nan")) == "—"
+    assert format_value(datetime.date(2021, 3, 4)) == "04 Mar 2021"
+    assert format_value(datetime.datetime(2021, 3, 4)) == "04 Mar 2021"
+    assert format_value(datetime.datetime(2021, 3, 4, 9, 30)) == "04 Mar 2021 09:30"
+    assert format_value(datetime.timedelta(hours=9, minutes=5, seconds=7)) == "09:05:07"
+    assert format_value(None) == "—"
+    assert format_value(True) == "Yes"
+
+
+def test_is_id_column():
+    assert is_id_column("ID") and is_id_column("manager_id") and is_id_column("joining_year")
+    assert is_id_column("phone") and is_id_column("pincode")
+    assert not is_id_column("salary") and not is_id_column("idle_days")
+
+
+def test_render_html_single_value():
+    result = QueryResult("SELECT ...", pa.table({"avg<salary>": [decimal.Decimal("61250.5")]}))
+    assert render_html(result) == "<b>avg&lt;salary&gt;</b>: 61,250.50"
+
+
+def test_truncation_footer():
+    table = pa.table({"id": list(range(30)), "salary": [50000 + i for i in range(30)]})
+    html = render_html(QueryResult("SELECT ...", table), max_rows=10)
+    assert html.count("<tr>") == 11
+    assert html.endswith("<div class='hr-table-note'>Showing 10 of 30 rows</div>")
+    markdown = render_markdown(QueryResult("SELECT ...", table, truncated=True), max_rows=10)
+    assert markdown.splitlines()[1] == "|---:|---:|"
+    assert markdown.endswith("_Showing 10 of 30+ rows_")
+    # Everything shown and nothing cut off: no footer
+    assert "Showing" not in render_markdown(QueryResult("SELECT ...", table.slice(0, 5)), max_rows=10)
+    assert render_html(QueryResult("SELECT ...", table.slice(0, 0))) == "No results"
@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sql_cache import SQLResultCache, is_read_only, normalize_sql
+from sql_schema import SchemaCache
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'hr.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE employees (id INTEGER PRIMARY KEY, name VARCHAR(100), salary NUMERIC)"))
+        conn.execute(text("INSERT INTO employees (name, salary) VALUES ('Asha', 1000), ('Ravi', 2000)"))
+    return engine
+
+
+@pytest.fixture
+def cache(engine, tmp_path):
+    # marker_interval=0: compare table markers on every lookup
+    return SQLResultCache(engine, SchemaCache(engine, path=str(tmp_path / "schema.json")), marker_interval=0)
+
+
+def run(engine):
+    def execute(query):
+        with engine.connect() as conn:
+            return str(conn.execute(text(query)).scalar())
+    return execute
+
+
+def write(engine, statement):
+    with engine.begin() as conn:
+        conn.execute(text(statement))
+
+
+def test_serves_unchanged_tables_from_cache(engine, cache):
+    assert cache.run("SELECT SUM(salary) FROM employees", run(engine)) == "3000"
+    assert cache.run("select sum(salary)  from employees;", run(engine)) == "3000"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.parametrize("statement, expected", [
+    ("UPDATE employees SET salary = salary * 10", "30000"),
+    ("INSERT INTO employees (name, salary) VALUES ('Meera', 500)", "3500"),
+    ("DELETE FROM employees WHERE name = 'Ravi'", "1000"),
+])
+def test_write_invalidates(engine, cache, statement, expected):
+    cache.run("SELECT SUM(salary) FROM employees", run(engine))
+    write(engine, statement)
+    assert cache.run("SELECT SUM(salary) FROM employees", run(engine)) == expected
+    assert cache.invalidations == 1
+
+
+@pytest.mark.parametrize("query, read_only", [
+    ("SELECT * FROM employees", True),
+    ("WITH t AS (SELECT 1) SELECT * FROM t", True),
+    ("EXPLAIN SELECT * FROM employees", True),
+    ("EXPLAIN ANALYZE SELECT * FROM employees", True),
+    ("EXPLAIN (ANALYZE, BUFFERS) SELECT 1", True),
+    ("EXPLAIN ANALYZE DELETE FROM employees", False),
+    ("EXPLAIN (ANALYZE) UPDATE employees SET salary = 0", False),
+    ("explain format=json delete from employees", False),
+    ("DELETE FROM employees", False),
+])
+def test_is_read_only(query, read_only):
+    assert is_read_only(normalize_sql(query)) is read_only
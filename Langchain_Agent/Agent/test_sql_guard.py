@@ -0,0 +1,111 @@
+import pytest
+from sqlalchemy import create_engine, event, text
+from sql_guard import SQLGuard, SQLRejected
+from sql_schema import SchemaCache
+
+
+@pytest.fixture
+def guard(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'hr.db'}")
+
+    @event.listens_for(engine, "connect")
+    def attach_catalog(dbapi_connection, _):
+        # A stand-in for MySQL's information_schema, so mixed queries can be planned
+        dbapi_connection.execute("ATTACH DATABASE ':memory:' AS information_schema")
+        dbapi_connection.execute("CREATE TABLE information_schema.tables (table_schema TEXT, table_name TEXT)")
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE departments (id INTEGER PRIMARY KEY, name VARCHAR(50))"))
+        conn.execute(text(
+            "CREATE TABLE employees (id INTEGER PRIMARY KEY, name VARCHAR(100), "
+            "department_id INTEGER REFERENCES departments(id), salary NUMERIC)"
+        ))
+        conn.execute(text("INSERT INTO departments (id, name) VALUES (1, 'Engineering'), (2, 'Sales')"))
+        conn.execute(
+            text("INSERT INTO employees (name, department_id, salary) VALUES (:name, 1, 1000)"),
+            [{"name": f"Person {i}"} for i in range(300)],
+        )
+    schema_cache = SchemaCache(engine, path=str(tmp_path / "schema.json"))
+    return SQLGuard(engine, schema_cache, max_rows=100, max_rows_examined=10_000)
+
+
+@pytest.mark.parametrize("sql", [
+    "DELETE FROM employees",
+    "DROP TABLE employees",
+    "UPDATE employees SET salary = 0",
+    "SELECT * FROM employees FOR UPDATE",
+    "SELECT 1; DELETE FROM employees",
+    "EXPLAIN ANALYZE DELETE FROM employees",
+    "EXPLAIN DELETE FROM employees",
+])
+def test_rejects_writes(guard, sql):
+    with pytest.raises(SQLRejected):
+        guard.check(sql)
+
+
+@pytest.mark.parametrize("dialect", ["sqlite", "postgres", "mysql"])
+def test_rejects_explain_of_writes_in_every_dialect(guard, dialect):
+    guard.dialect = dialect
+    with pytest.raises(SQLRejected):
+        guard.check("EXPLAIN ANALYZE DELETE FROM employees")
+
+
+def test_rejects_unknown_table_with_hint(guard):
+    with pytest.raises(SQLRejected, match="Did you mean 'employees'"):
+        guard.check("SELECT name FROM employes")
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT nme FROM employees",
+    "SELECT e.nme FROM employees e",
+    "SELECT d.title FROM employees e JOIN departments d ON d.id = e.department_id",
+])
+def test_rejects_unknown_column(guard, sql):
+    with pytest.raises(SQLRejected):
+        guard.check(sql)
+
+
+def test_accepts_aliases_ctes_and_case(guard):
+    guard.check("SELECT Name FROM Employees WHERE id = 3")
+    guard.check(
+        "WITH t AS (SELECT department_id, AVG(salary) a FROM employees GROUP BY 1) "
+        "SELECT d.name, t.a FROM t JOIN departments d ON d.id = t.department_id ORDER BY t.a"
+    )
+
+
+def test_injects_limit_when_missing(guard):
+    assert guard.check("SELECT name FROM employees;") == "SELECT name FROM employees\nLIMIT 101"
+    assert guard.check("SELECT name FROM employees -- all") == "SELECT name FROM employees -- all\nLIMIT 101"
+    assert guard.check("SELECT name FROM employees LIMIT 5") == "SELECT name FROM employees LIMIT 5"
+    assert guard.limits_added == 2
+
+
+def test_rejects_cross_join_above_cost(guard):
+    # 300 x 300 rows, no join condition
+    with pytest.raises(SQLRejected, match="without a usable join condition"):
+        guard.check("SELECT * FROM employees a, employees b")
+    # The same self-join on the primary key is a lookup per row
+    guard.check("SELECT * FROM employees a JOIN employees b ON b.id = a.id")
+    assert guard.rejected["cost"] == 1
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT table_name FROM information_schema.tables WHERE table_schema = DATABASE()",
+    "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = 'employees'",
+])
+def test_catalog_queries_pass(guard, sql):
+    # How an agent finds tables on MySQL; parsed as MySQL, nothing to EXPLAIN
+    guard.dialect = "mysql"
+    assert guard.check(sql) == f"{sql}\nLIMIT 101"
+    assert not guard.rejected
+
+
+def test_catalog_table_does_not_exempt_hr_tables(guard):
+    # Joining a catalog table must not switch off the cost check ...
+    with pytest.raises(SQLRejected, match="Query too expensive"):
+        guard.check("SELECT a.name FROM employees a, employees b, employees c, information_schema.tables t")
+    # ... nor the check of qualified HR columns
+    with pytest.raises(SQLRejected, match="nme"):
+        guard.check("SELECT e.nme, t.table_name FROM employees e JOIN information_schema.tables t ON t.table_name = e.name")
+    sql = "SELECT e.name FROM employees e WHERE e.name IN (SELECT table_name FROM information_schema.tables)"
+    assert guard.check(sql) == f"{sql}\nLIMIT 101"
@@ -0,0 +1,26 @@
+import pyarrow as pa
+from sqlalchemy import create_engine, text
+from sql_results import QueryResult, run_query
+
+
+def test_run_query_keeps_duplicate_columns_and_truncates(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'hr.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE departments (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("CREATE TABLE employees (id INTEGER PRIMARY KEY, name TEXT, department_id INTEGER)"))
+        conn.execute(text("INSERT INTO departments VALUES (1, 'Engineering')"))
+        conn.execute(text("INSERT INTO employees (name, department_id) VALUES (:name, 1)"),
+                     [{"name": f"Person {i}"} for i in range(30)])
+    result = run_query(engine, "SELECT e.name, d.name FROM employees e JOIN departments d ON d.id = e.department_id",
+                       max_rows=10)
+    assert result.columns == ["name", "name"]
+    assert (result.num_rows, result.truncated) == (10, True)
+    assert result.preview().splitlines()[1] == "Person 0 | Engineering"
+
+
+def test_preview_stays_within_budget():
+    table = pa.table({"id": list(range(5000)), "name": [f"Employee number {i}" for i in range(5000)]})
+    preview = QueryResult("SELECT ...", table).preview(max_tokens=200)
+    assert len(preview) // 4 <= 200 + 10
+    assert preview.endswith("of 5000 rows")
+    assert QueryResult("SELECT ...", table.slice(0, 0)).preview() == "No results"
@@ -0,0 +1,98 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+from langchain_core.agents import AgentAction
+from weather_client import WeatherClient, normalize_location, weather_from_steps
+
+
+class StubWeatherAPI(BaseHTTPRequestHandler):
+    """current.json stand-in: echoes the location with a request counter."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.client_address, parse_qs(urlparse(self.path).query)["q"][0]))
+            count = len(server.requests)
+        body = json.dumps({"location": {"name": server.requests[-1][1]}, "current": {"temp_c": count}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubWeatherAPI)
+    server.lock = threading.Lock()
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("WEATHERAPI_BASE_URL", f"http://127.0.0.1:{server.server_port}/v1")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_reuses_one_keep_alive_connection(server):
+    client = WeatherClient(api_key="test", ttl=0)
+    for location in ["Pune", "Delhi", "Goa"]:
+        client.current(location)
+    assert client.requests_made == 3
+    assert len({address for address, _ in server.requests}) == 1
+
+
+def test_ttl_hit_shares_entry_across_spellings(server):
+    client = WeatherClient(api_key="test", ttl=60)
+    first = client.current("  Mawsynram ,Meghalaya ")
+    assert client.current("mawsynram, meghalaya") == first
+    assert client.requests_made == 1
+    assert normalize_location("  Mawsynram ,Meghalaya ") == "mawsynram, meghalaya"
+
+
+def test_stale_reading_is_served_then_refreshed(server):
+    client = WeatherClient(api_key="test", ttl=0.05, stale_ttl=60)
+    first = client.current("Pune")
+    time.sleep(0.06)
+    assert client.current("Pune") == first  # stale, returned at once
+    wait_for(lambda: client._cache["pune"][1] is not first)
+    assert client.current("Pune")["current"]["temp_c"] == 2  # the refreshed reading
+
+
+def test_evicts_least_recently_used_and_expired(server):
+    client = WeatherClient(api_key="test", ttl=0.05, stale_ttl=0.05, max_entries=2)
+    client.current("a")
+    client.current("b")
+    client.current("a")  # a is now the most recently used
+    client.current("c")
+    assert list(client._cache) == ["a", "c"]
+    time.sleep(0.12)
+    client.current("d")  # expired a and c are swept
+    assert list(client._cache) == ["d"]
+    client.current("d")
+    assert client.requests_made == 4
+
+
+def test_weather_from_steps_picks_first_successful_reading():
+    reading = {"current": {"temp_c": 21}}
+    steps = [
+        (AgentAction("Web Search", "Goa weather", ""), "sunny"),
+        (AgentAction("get_weather", "Goa", ""), {"error": "timeout"}),
+        (AgentAction("Weather API", "Goa", ""), reading),
+    ]
+    assert weather_from_steps(steps) is reading
+    assert weather_from_steps(steps[:2]) is None
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Any
+from langchain_core.tools import BaseTool, ToolException
+
+# Seconds a result stays valid, keyed by tool name; others use default_ttl
+TOOL_TTLS = {
+    "duckduckgo_search": 6 * 3600,
+    "wikipedia": 7 * 24 * 3600,
+}
+
+
+def normalize_tool_input(tool_input) -> str:
+    """'Mawsynram  Tourism' and 'mawsynram tourism' share a cache entry;
+    dict inputs are compared with sorted keys."""
+    if isinstance(tool_input, str):
+        return re.sub(r"\s+", " ", tool_input).strip().lower()
+    if isinstance(tool_input, dict):
+        return json.dumps({k: normalize_tool_input(v) for k, v in tool_input.items()}, sort_keys=True)
+    return json.dumps(tool_input, sort_keys=True, default=str)
+
+
+# -------------------------------
+# SQLite store for tool results
+# -------------------------------
+class ToolResultCache:
+    """Tool outputs keyed by (tool name, normalized input).
+
+    Results expire after the tool's TTL. Errors are cached too, for error_ttl
+    seconds, so a failing lookup is not retried on every agent step. Beyond
+    max_entries the least recently used rows are dropped. Each row keeps the
+    latency of the call that produced it, which is what a hit saves.
+    """
+
+    def __init__(self, path="./tool_cache.sqlite3", ttls=None, default_ttl=24 * 3600, error_ttl=300, max_entries=2000):
+        self.ttls = {**TOOL_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.error_ttl = error_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.error_hits = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS tool_results (
+                tool TEXT NOT NULL,
+                key TEXT NOT NULL,
+                result TEXT NOT NULL,
+                is_error INTEGER NOT NULL,
+                latency REAL NOT NULL,
+                expires REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (tool, key)
+            );
+            CREATE INDEX IF NOT EXISTS tool_results_last_used ON tool_results (last_used);
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _key(tool_input) -> str:
+        return hashlib.sha256(normalize_tool_input(tool_input).encode("utf-8")).hexdigest()
+
+    def get(self, tool: str, tool_input):
+        """Returns (result, is_error) or None."""
+        now = time.time()
+        key = self._key(tool_input)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, is_error, latency FROM tool_results WHERE tool = ? AND key = ? AND expires > ?",
+                (tool, key, now),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE tool_results SET last_used = ? WHERE tool = ? AND key = ?", (now, tool, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            self.error_hits += row[1]
+            self.saved_seconds += row[2]
+        return json.loads(row[0]), bool(row[1])
+
+    def put(self, tool: str, tool_input, result, latency: float, is_error=False):
+        now = time.time()
+        ttl = self.error_ttl if is_error else self.ttls.get(tool, self.default_ttl)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tool_results (tool, key, result, is_error, latency, expires, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (tool, self._key(tool_input), json.dumps(result, default=str), int(is_error), latency, now + ttl, now),
+            )
+            # Expired rows first, then least recently used over the cap
+            self._conn.execute("DELETE FROM tool_results WHERE expires <= ?", (now,))
+            self._conn.execute(
+                """DELETE FROM tool_results WHERE rowid IN (
+                    SELECT rowid FROM tool_results ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return (
+            f"tool cache: {self.hits} hits ({self.error_hits} cached errors), {self.misses} misses "
+            f"({rate:.0%}), {self.saved_seconds:.1f}s of tool latency saved"
+        )
+
+
+# -------------------------------
+# Caching wrapper for any LangChain tool
+# -------------------------------
+class CachedTool(BaseTool):
+    """Drop-in replacement for `tool` (same name, description and args) that
+    answers repeated inputs from `cache`. Failures are returned to the agent as
+    the error message, whether the failure is fresh or cached."""
+
+    tool: BaseTool
+    cache: Any
+    handle_tool_error: bool = True
+
+    def __init__(self, tool: BaseTool, cache: ToolResultCache, **kwargs):
+        kwargs.setdefault("name", tool.name)
+        kwargs.setdefault("description", tool.description)
+        kwargs.setdefault("args_schema", tool.args_schema)
+        super().__init__(tool=tool, cache=cache, **kwargs)
+
+    def _run(self, *args, **kwargs):
+        kwargs.pop("run_manager", None)
+        # ReAct passes a string, structured callers {"query": ...}: same key for both
+        if len(args) == 1 and not kwargs:
+            tool_input = args[0]
+        elif not args and len(kwargs) == 1:
+            tool_input = next(iter(kwargs.values()))
+        else:
+            tool_input = kwargs
+        cached = self.cache.get(self.name, tool_input)
+        if cached is not None:
+            result, is_error = cached
+            if is_error:
+                raise ToolException(result)
+            return result
+
+        start = time.perf_counter()
+        try:
+            result = self.tool.invoke(tool_input)
+        except Exception as e:
+            self.cache.put(self.name, tool_input, str(e), time.perf_counter() - start, is_error=True)
+            raise ToolException(str(e)) from e
+        self.cache.put(self.name, tool_input, result, time.perf_counter() - start)
+        return result
@@ -0,0 +1,114 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+WEATHER_TOOL_NAMES = {"get_weather", "Weather API"}
+
+
+def normalize_location(location: str) -> str:
+    """'  Mawsynram ,Meghalaya ' and 'mawsynram, meghalaya' share a cache entry."""
+    location = re.sub(r"\s*,\s*", ", ", location.strip().lower())
+    return re.sub(r"\s+", " ", location)
+
+
+# -------------------------------
+# Pooled, cached WeatherAPI client
+# -------------------------------
+class WeatherClient:
+    """Keep-alive session with timeouts and retries, plus a per-location cache.
+
+    Within ttl seconds a cached reading is returned as is. Up to stale_ttl
+    seconds after that, the stale reading is returned immediately and refreshed
+    in the background. Older entries are dropped and fetched synchronously.
+    At most max_entries locations are kept, least recently used evicted first.
+    """
+
+    def __init__(self, api_key=None, base_url=None, ttl=600, stale_ttl=3600, timeout=(3.05, 10), pool_size=10,
+                 max_entries=500):
+        self.api_key = api_key or os.getenv("WEATHERAPI_KEY")
+        self.base_url = (base_url or os.getenv("WEATHERAPI_BASE_URL", "http://api.weatherapi.com/v1")).rstrip("/")
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504), allowed_methods=("GET",))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._cache = OrderedDict()  # normalized location -> (fetched_at, data), LRU order
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=2)
+        self.requests_made = 0
+
+    def _fetch(self, location: str) -> dict:
+        response = self.session.get(
+            f"{self.base_url}/current.json",
+            params={"key": self.api_key, "q": location},
+            timeout=self.timeout,
+        )
+        with self._lock:
+            self.requests_made += 1  # Also called from the refresh thread
+        response.raise_for_status()
+        data = response.json()
+        key = normalize_location(location)
+        now = time.monotonic()
+        with self._lock:
+            self._cache[key] = (now, data)
+            self._cache.move_to_end(key)
+            # Cap the size, and drop expired entries that reach the LRU end
+            while self._cache:
+                oldest_key, (fetched_at, _) = next(iter(self._cache.items()))
+                if len(self._cache) <= self.max_entries and now - fetched_at < self.ttl + self.stale_ttl:
+                    break
+                del self._cache[oldest_key]
+        return data
+
+    def _refresh(self, key: str, location: str):
+        try:
+            self._fetch(location)
+        except Exception:
+            pass  # Keep serving the stale reading; the next call retries
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def current(self, location: str) -> dict:
+        """Raw current.json payload for location."""
+        key = normalize_location(location)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                if time.monotonic() - entry[0] >= self.ttl + self.stale_ttl:
+                    del self._cache[key]
+                    entry = None
+                else:
+                    self._cache.move_to_end(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < self.ttl:
+                return entry[1]
+            if age < self.ttl + self.stale_ttl:
+                with self._lock:
+                    start_refresh = key not in self._refreshing
+                    self._refreshing.add(key)
+                if start_refresh:
+                    self._refresher.submit(self._refresh, key, location)
+                return entry[1]
+        return self._fetch(location)
+
+
+def weather_from_steps(intermediate_steps):
+    """Returns the first successful weather observation an agent already made,
+    so the page does not request the same data again."""
+    for action, observation in intermediate_steps:
+        if action.tool in WEATHER_TOOL_NAMES and isinstance(observation, dict) and "error" not in observation:
+            return observation
+    return None
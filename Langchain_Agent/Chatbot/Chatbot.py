@@ -1,7 +1,7 @@
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.messages import HumanMessage, AIMessage
 from dotenv import load_dotenv
+from context_window import ConversationContext
 
 load_dotenv()
 
@@ -13,40 +13,35 @@ chat_template = ChatPromptTemplate.from_messages([
     ("human", "{query}")
 ])
 
-chat_history = []
-
-# ✅ Load history from talk.txt (if exists) and convert to message objects
-try:
-    with open("talk.txt", "r") as file:
-        lines = [line.strip() for line in file.readlines()]
-        for i, line in enumerate(lines):
-            if i % 2 == 0:
-                chat_history.append(HumanMessage(content=line))
-            else:
-                chat_history.append(AIMessage(content=line))
-    # print("Chat history loaded from talk.txt.",chat_history)
-except FileNotFoundError:
-    pass
+summary_model = ChatOpenAI(model="gpt-3.5-turbo", temperature=0, max_tokens=200)
+
+
+def summarize(summary, messages):
+    """Folds older messages into the running summary."""
+    lines = "\n".join(f"{'User' if m.type == 'human' else 'Assistant'}: {m.content}" for m in messages)
+    return summary_model.invoke(
+        "Update the running summary of a conversation with the new lines below. "
+        "Keep names, facts and open questions; stay under 150 words.\n\n"
+        f"Current summary:\n{summary or '(empty)'}\n\nNew lines:\n{lines}\n\nUpdated summary:"
+    ).content.strip()
+
+
+# ✅ Recent turns within a token budget + running summary of older ones.
+# Each turn is appended to talk.jsonl as it happens; the old talk.txt is imported once.
+context = ConversationContext(summarize, budget=1500, legacy_path="talk.txt")
 
 # Chat loop
 while True:
     query = input("Enter your query: ")
 
     if query.lower() == "exit":
-        # ✅ Save structured chat to talk.txt
-        with open("talk.txt", "a") as file:
-            for msg in chat_history:
-                file.write(f"{msg.content}\n")
         break
 
-    # ✅ Append user query
-    chat_history.append(HumanMessage(content=query))
-
     # Format prompt and get model response
-    prompt = chat_template.format_prompt(chat_history=chat_history, query=query)
+    prompt = chat_template.format_prompt(chat_history=context.messages(), query=query)
     response = model.invoke(prompt)
 
-    # ✅ Append model response
-    chat_history.append(AIMessage(content=response.content))
+    # ✅ Persist this turn (and fold old turns into the summary if over budget)
+    context.add_turn(query, response.content)
 
     print("Assistant:", response.content)
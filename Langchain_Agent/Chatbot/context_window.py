@@ -0,0 +1,155 @@
+import json
+import os
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, message_to_dict, messages_from_dict
+
+
+# -------------------------------
+# Tokenizers
+# -------------------------------
+def approx_token_counter(text: str) -> int:
+    # Roughly 4 characters per token for English text
+    return max(1, len(text) // 4)
+
+
+def default_token_counter(model="gpt-4"):
+    """tiktoken when installed, otherwise the character heuristic."""
+    try:
+        import tiktoken
+    except ImportError:
+        return approx_token_counter
+    encoding = tiktoken.encoding_for_model(model)
+    return lambda text: len(encoding.encode(text))
+
+
+# -------------------------------
+# Durable, append-only turn log
+# -------------------------------
+class TurnLog:
+    """One JSON line per message. Each turn is appended and fsynced; earlier
+    lines are never rewritten."""
+
+    def __init__(self, path="talk.jsonl"):
+        self.path = path
+
+    def append(self, messages):
+        """Appends messages and returns the byte offset of each one."""
+        offsets = []
+        with open(self.path, "ab") as file:
+            offset = file.tell()
+            for message in messages:
+                line = json.dumps(message_to_dict(message), ensure_ascii=False).encode("utf-8") + b"\n"
+                file.write(line)
+                offsets.append(offset)
+                offset += len(line)
+            file.flush()
+            os.fsync(file.fileno())
+        return offsets
+
+    def read_from(self, offset=0):
+        """Returns [(offset, message)] for every message at or after offset."""
+        entries = []
+        try:
+            with open(self.path, "rb") as file:
+                file.seek(offset)
+                for line in file:
+                    # A line without newline was cut off by a crash mid-write
+                    if line.endswith(b"\n"):
+                        entries.append((offset, messages_from_dict([json.loads(line)])[0]))
+                    offset += len(line)
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def import_legacy(self, legacy_path: str):
+        """One-off import of the old talk.txt (alternating human/AI lines).
+        A multi-paragraph answer continues after blank lines, so a line that
+        follows a blank line belongs to the preceding answer. talk.txt
+        re-appended the whole history on every exit, so repeated
+        (question, answer) pairs are dropped."""
+        if os.path.exists(self.path) or not os.path.exists(legacy_path):
+            return
+        turns = []  # alternating human, AI texts
+        after_blank = False
+        with open(legacy_path, "r", encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if not line:
+                    after_blank = True
+                elif after_blank and len(turns) % 2 == 0:
+                    turns[-1] += "\n\n" + line
+                    after_blank = False
+                else:
+                    turns.append(line)
+                    after_blank = False
+        seen, messages = set(), []
+        for i in range(0, len(turns) - 1, 2):
+            pair = (turns[i], turns[i + 1])
+            if pair not in seen:
+                seen.add(pair)
+                messages += [HumanMessage(content=pair[0]), AIMessage(content=pair[1])]
+        self.append(messages)
+
+
+# -------------------------------
+# Token-budgeted context with rolling summary
+# -------------------------------
+class ConversationContext:
+    """Keeps the most recent messages within a token budget. Older messages are
+    folded into a running summary with summarize(previous_summary, messages),
+    so each refresh only covers the newly folded turns.
+
+    The summary and the log offset it covers are saved to summary_path, so a
+    new session reads only the messages that are not summarized yet.
+    """
+
+    def __init__(self, summarize, log_path="talk.jsonl", summary_path="talk_summary.json", budget=1500, count_tokens=None, legacy_path=None):
+        self.summarize = summarize
+        self.summary_path = summary_path
+        self.budget = budget
+        self.count_tokens = count_tokens or default_token_counter()
+        self.log = TurnLog(log_path)
+        if legacy_path:
+            self.log.import_legacy(legacy_path)
+
+        state = {"summary": "", "offset": 0}
+        if os.path.exists(summary_path):
+            with open(summary_path, "r", encoding="utf-8") as file:
+                state = json.load(file)
+        self.summary = state["summary"]
+        self.recent = [(offset, message, self.count_tokens(message.content)) for offset, message in self.log.read_from(state["offset"])]
+        self._fold_if_needed()
+
+    def _tokens(self) -> int:
+        return self.count_tokens(self.summary) + sum(tokens for _, _, tokens in self.recent)
+
+    def _fold_if_needed(self):
+        if self._tokens() <= self.budget:
+            return
+        # Fold down to 3/4 of the budget so we do not summarize on every turn
+        folded = []
+        while len(self.recent) > 2 and self._tokens() > self.budget * 3 // 4:
+            folded.append(self.recent.pop(0)[1])
+        if not folded:
+            return
+        self.summary = self.summarize(self.summary, folded)
+        self._save_state()
+
+    def _save_state(self):
+        offset = self.recent[0][0] if self.recent else os.path.getsize(self.log.path)
+        tmp_path = self.summary_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump({"summary": self.summary, "offset": offset}, file)
+        os.replace(tmp_path, self.summary_path)
+
+    def add_turn(self, query: str, answer: str):
+        messages = [HumanMessage(content=query), AIMessage(content=answer)]
+        offsets = self.log.append(messages)
+        self.recent += [(o, m, self.count_tokens(m.content)) for o, m in zip(offsets, messages)]
+        self._fold_if_needed()
+
+    def messages(self):
+        """History to put in front of the next query."""
+        history = [message for _, message, _ in self.recent]
+        if self.summary:
+            history.insert(0, SystemMessage(content=f"Summary of the earlier conversation: {self.summary}"))
+        return history
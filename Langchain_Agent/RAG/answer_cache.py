@@ -0,0 +1,135 @@
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+from array import array
+from operator import mul
+
+
+def _unit(vector):
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def _chunk_key(chunk_ids, history="") -> str:
+    # Order of retrieval does not matter, only which chunks were used. The
+    # prompt also carries the chat history ("what about his manager?" depends
+    # on the turn before), so a non-empty history window is part of the key
+    key = "\n".join(sorted(chunk_ids))
+    if history:
+        key += "\0" + hashlib.sha256(history.encode("utf-8")).hexdigest()
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+# -------------------------------
+# Semantic answer cache
+# -------------------------------
+class SemanticAnswerCache:
+    """Reuses an answer when a new question is close enough (cosine) to a cached
+    one, retrieval returned the same chunks and the prompt had the same chat
+    history window (follow-ups only hit after the same conversation). Entries expire after ttl_seconds;
+    beyond max_entries the least recently used are dropped."""
+
+    def __init__(self, embeddings, path="./answer_cache.sqlite3", threshold=0.95, ttl_seconds=24 * 3600, max_entries=500):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS answers (
+                id INTEGER PRIMARY KEY,
+                chunk_key TEXT NOT NULL,
+                question TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                answer TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS answers_chunk_key ON answers (chunk_key);
+            CREATE INDEX IF NOT EXISTS answers_last_used ON answers (last_used);
+            CREATE TABLE IF NOT EXISTS answer_chunks (
+                answer_id INTEGER NOT NULL,
+                chunk_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS answer_chunks_chunk_id ON answer_chunks (chunk_id);
+            """
+        )
+        self._conn.commit()
+
+    def lookup(self, question: str, chunk_ids, history=""):
+        """Returns the cached answer or None."""
+        vector = _unit(self.embeddings.embed_query(question))
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, vector, answer FROM answers WHERE chunk_key = ? AND created > ?",
+                (_chunk_key(chunk_ids, history), now - self.ttl_seconds),
+            ).fetchall()
+            best_id, best_answer, best_score = None, None, self.threshold
+            for answer_id, blob, answer in rows:
+                score = sum(map(mul, vector, array("f", blob)))
+                if score >= best_score:
+                    best_id, best_answer, best_score = answer_id, answer, score
+            if best_id is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE answers SET last_used = ? WHERE id = ?", (now, best_id))
+            self._conn.commit()
+        self.hits += 1
+        return best_answer
+
+    def store(self, question: str, chunk_ids, answer: str, history=""):
+        vector = _unit(self.embeddings.embed_query(question))
+        chunk_ids = list(chunk_ids)
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO answers (chunk_key, question, vector, answer, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (_chunk_key(chunk_ids, history), question, array("f", vector).tobytes(), answer, now, now),
+            )
+            self._conn.executemany(
+                "INSERT INTO answer_chunks (answer_id, chunk_id) VALUES (?, ?)",
+                [(cursor.lastrowid, cid) for cid in chunk_ids],
+            )
+            # Expired rows first, then least recently used over the cap
+            self._delete_where("created <= ?", (now - self.ttl_seconds,))
+            self._delete_where(
+                "id IN (SELECT id FROM answers ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def invalidate_chunks(self, chunk_ids) -> int:
+        """Drops every answer built from any of chunk_ids. Returns rows removed."""
+        chunk_ids = list(chunk_ids)
+        removed = 0
+        with self._lock:
+            for start in range(0, len(chunk_ids), 500):
+                part = chunk_ids[start:start + 500]
+                removed += self._delete_where(
+                    f"id IN (SELECT answer_id FROM answer_chunks WHERE chunk_id IN ({','.join('?' * len(part))}))",
+                    part,
+                )
+            self._conn.commit()
+        return removed
+
+    def _delete_where(self, condition: str, params) -> int:
+        ids = [row[0] for row in self._conn.execute(f"SELECT id FROM answers WHERE {condition}", params)]
+        for start in range(0, len(ids), 500):
+            part = ids[start:start + 500]
+            marks = ",".join("?" * len(part))
+            self._conn.execute(f"DELETE FROM answer_chunks WHERE answer_id IN ({marks})", part)
+            self._conn.execute(f"DELETE FROM answers WHERE id IN ({marks})", part)
+        return len(ids)
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"answer cache: {self.hits} hits, {self.misses} misses ({rate:.0%})"
@@ -0,0 +1,98 @@
+"""Startup and query latency: Chroma vs. FlatIndex (float32 / float16).
+
+Each store is built once from the same chunks; cold start (open the store and
+answer one query) is then timed in a fresh process so no client caches help.
+
+    python bench_backends.py
+    python bench_backends.py --data ./corpus_dir --chunk-size 500
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from langchain_community.vectorstores import Chroma
+from ingest import chunk_id, iter_chunks
+from flat_index import FlatIndex
+from local_embeddings import HashingEmbeddings
+
+
+def open_store(backend, path, embeddings):
+    if backend == "chroma":
+        return Chroma(persist_directory=path, embedding_function=embeddings)
+    return FlatIndex(path, embeddings, dtype=backend.split("-")[1])
+
+
+def cold_start(backend, path, dim, query):
+    """Runs in a child process; prints open and first-query times in ms."""
+    embeddings = HashingEmbeddings(dim)
+    start = time.perf_counter()
+    store = open_store(backend, path, embeddings)
+    opened = time.perf_counter()
+    store.similarity_search(query, k=3)
+    done = time.perf_counter()
+    print(json.dumps({"open_ms": (opened - start) * 1000, "first_query_ms": (done - opened) * 1000}))
+
+
+def dir_size(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default="./data.txt")
+    parser.add_argument("--golden", default="./golden_questions.json")
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--chunk-overlap", type=int, default=10)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--cold", nargs=2, metavar=("BACKEND", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    with open(args.golden, encoding="utf-8") as file:
+        questions = [item["question"] for item in json.load(file)]
+
+    if args.cold:
+        cold_start(args.cold[0], args.cold[1], args.dim, questions[0])
+        return
+
+    embeddings = HashingEmbeddings(args.dim)
+    chunks = list(iter_chunks(args.data, args.chunk_size, args.chunk_overlap))
+    ids = [chunk_id(doc) for doc in chunks]
+    print(f"{len(chunks)} chunks, {len(questions)} queries, dim {args.dim}\n")
+    print(f"{'backend':<14} {'disk KB':>8} {'open ms':>8} {'1st query ms':>13} {'query ms':>9}")
+
+    with tempfile.TemporaryDirectory() as root:
+        for backend in ("chroma", "flat-float32", "flat-float16"):
+            path = os.path.join(root, backend)
+            if backend == "chroma":
+                Chroma.from_documents(chunks, embeddings, ids=ids, persist_directory=path)
+            else:
+                FlatIndex.from_documents(chunks, embeddings, ids=ids, persist_directory=path, dtype=backend.split("-")[1])
+
+            child = subprocess.run(
+                [sys.executable, __file__, "--cold", backend, path, "--dim", str(args.dim), "--golden", args.golden],
+                capture_output=True, text=True, check=True,
+            )
+            cold = json.loads(child.stdout.strip().splitlines()[-1])
+
+            store = open_store(backend, path, embeddings)
+            timings = []
+            for question in questions:
+                start = time.perf_counter()
+                store.similarity_search(question, k=3)
+                timings.append((time.perf_counter() - start) * 1000)
+            del store
+
+            print(
+                f"{backend:<14} {dir_size(path) / 1024:>8.0f} {cold['open_ms']:>8.1f} "
+                f"{cold['first_query_ms']:>13.1f} {statistics.mean(timings):>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Sweeps splitter configurations and reports index size, build time, query
+latency and retrieval hit rate against a golden question set. Runs offline
+with deterministic hashing embeddings, so results are reproducible.
+
+    python bench_chunking.py
+    python bench_chunking.py --data ./corpus_dir --sizes 200,500,1000 --overlaps 0,50
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from langchain_community.vectorstores import Chroma
+from ingest import iter_chunks
+from local_embeddings import HashingEmbeddings
+
+
+def dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def evaluate(data_path, golden, chunk_size, chunk_overlap, k, embeddings):
+    chunks = list(iter_chunks(data_path, chunk_size, chunk_overlap))
+    with tempfile.TemporaryDirectory() as persist_dir:
+        start = time.perf_counter()
+        vectorstore = Chroma.from_documents(chunks, embeddings, persist_directory=persist_dir)
+        build_seconds = time.perf_counter() - start
+
+        hits, timings = 0, []
+        for item in golden:
+            start = time.perf_counter()
+            docs = vectorstore.similarity_search(item["question"], k=k)
+            timings.append((time.perf_counter() - start) * 1000)
+            if any(item["answer"].lower() in doc.page_content.lower() for doc in docs):
+                hits += 1
+        index_bytes = dir_size(persist_dir)
+        # Release the SQLite handle before the temp dir is removed (matters on Windows)
+        del vectorstore
+
+    return {
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "chunks": len(chunks),
+        "index_kb": index_bytes / 1024,
+        "build_s": build_seconds,
+        "query_ms": statistics.mean(timings),
+        "hit_rate": hits / len(golden),
+        # Context handed to the LLM per question, in characters
+        "context_chars": k * statistics.mean(len(c.page_content) for c in chunks) if chunks else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default="./data.txt", help="file or directory of text files")
+    parser.add_argument("--golden", default="./golden_questions.json")
+    parser.add_argument("--sizes", default="100,200,400,800")
+    parser.add_argument("--overlaps", default="0,10,50")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--dim", type=int, default=256, help="hashing embedding size")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    with open(args.golden, encoding="utf-8") as file:
+        golden = json.load(file)
+    embeddings = HashingEmbeddings(args.dim)
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        for overlap in (int(o) for o in args.overlaps.split(",")):
+            if overlap >= size:
+                continue
+            results.append(evaluate(args.data, golden, size, overlap, args.k, embeddings))
+
+    header = f"{'size':>6} {'overlap':>7} {'chunks':>7} {'index KB':>9} {'build s':>8} {'query ms':>9} {'hit@' + str(args.k):>6} {'ctx chars':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['chunk_size']:>6} {r['chunk_overlap']:>7} {r['chunks']:>7} {r['index_kb']:>9.0f} "
+            f"{r['build_s']:>8.2f} {r['query_ms']:>9.2f} {r['hit_rate']:>6.2f} {r['context_chars']:>9.0f}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
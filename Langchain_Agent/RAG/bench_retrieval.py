@@ -0,0 +1,81 @@
+"""Recall@k and latency: dense-only Chroma vs. hybrid BM25 + vector retrieval.
+
+    python bench_retrieval.py                        # offline, hashing embeddings
+    python bench_retrieval.py --embed-latency-ms 150 # simulate a remote embedder
+    python bench_retrieval.py --openai               # real OpenAIEmbeddings
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from langchain_community.vectorstores import Chroma
+from ingest import load_chunks
+from hybrid import BM25Index, HybridRetriever
+from local_embeddings import HashingEmbeddings
+
+
+class SlowEmbeddings(HashingEmbeddings):
+    """Hashing embeddings with an artificial per-call delay."""
+
+    def __init__(self, latency_ms, size=256):
+        super().__init__(size)
+        self.latency = latency_ms / 1000
+
+    def embed_query(self, text):
+        time.sleep(self.latency)
+        return super().embed_query(text)
+
+
+def run(name, search, golden, k):
+    hits, timings = 0, []
+    for item in golden:
+        start = time.perf_counter()
+        docs = search(item["question"], k)
+        timings.append((time.perf_counter() - start) * 1000)
+        if any(item["answer"].lower() in doc.page_content.lower() for doc in docs):
+            hits += 1
+    timings.sort()
+    print(
+        f"{name:<8} recall@{k}: {hits / len(golden):.2f}  "
+        f"mean: {statistics.mean(timings):.1f} ms  "
+        f"p95: {timings[int(0.95 * (len(timings) - 1))]:.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data", default="./data.txt")
+    parser.add_argument("--golden", default="./golden_questions.json")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--chunk-overlap", type=int, default=10)
+    parser.add_argument("--embed-latency-ms", type=float, default=0.0)
+    parser.add_argument("--openai", action="store_true", help="use OpenAIEmbeddings (needs network)")
+    args = parser.parse_args()
+
+    if args.openai:
+        from dotenv import load_dotenv
+        from langchain_openai import OpenAIEmbeddings
+        load_dotenv()
+        embeddings = OpenAIEmbeddings()
+    else:
+        embeddings = SlowEmbeddings(args.embed_latency_ms)
+
+    with open(args.golden, encoding="utf-8") as file:
+        golden = json.load(file)
+    chunks = load_chunks(args.data, args.chunk_size, args.chunk_overlap)
+
+    # No caches in the way: every query pays for its embedding
+    with tempfile.TemporaryDirectory() as persist_dir:
+        vectorstore = Chroma.from_documents(chunks, embeddings, persist_directory=persist_dir)
+        hybrid = HybridRetriever(vectorstore=vectorstore, bm25=BM25Index.from_documents(chunks))
+
+        print(f"{len(chunks)} chunks, {len(golden)} questions")
+        run("dense", lambda q, k: vectorstore.similarity_search(q, k=k), golden, args.k)
+        run("hybrid", lambda q, k: hybrid.invoke(q, k=k), golden, args.k)
+        print(f"hybrid lexical fast path: {hybrid.stats['lexical']}/{len(golden)} queries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.embeddings import Embeddings
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def normalize_query(text: str) -> str:
+    """Questions that differ only in case/spacing share one cache entry."""
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+class LRUCache:
+    """Small thread-safe in-memory LRU."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+# -------------------------------
+# On-disk cache keyed by (model, text hash)
+# -------------------------------
+class EmbeddingCache:
+    def __init__(self, path="./embedding_cache.sqlite3", max_query_entries=10000):
+        self.max_query_entries = max_query_entries
+        # Shared across Streamlit script threads, so guard the connection
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )"""
+        )
+        # Query vectors are kept apart so eviction never touches document vectors
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS query_embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS query_embeddings_last_used ON query_embeddings (last_used)"
+        )
+        self._conn.commit()
+
+    def get_many(self, model: str, hashes) -> dict:
+        """Returns {text_hash: vector} for the hashes that are cached."""
+        found = {}
+        hashes = list(hashes)
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(hashes), 500):
+                part = hashes[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? "
+                    f"AND text_hash IN ({','.join('?' * len(part))})",
+                    [model, *part],
+                )
+                for h, blob in rows:
+                    found[h] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, model: str, items):
+        """Stores (text_hash, vector) pairs."""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                [(model, h, array("f", vector).tobytes()) for h, vector in items],
+            )
+            self._conn.commit()
+
+    def get_query(self, model: str, h: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vector FROM query_embeddings WHERE model = ? AND text_hash = ?",
+                (model, h),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE query_embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                (time.time(), model, h),
+            )
+            self._conn.commit()
+        return array("f", row[0]).tolist()
+
+    def put_query(self, model: str, h: str, vector):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO query_embeddings (model, text_hash, vector, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                (model, h, array("f", vector).tobytes(), time.time()),
+            )
+            # Size-based eviction: drop the least recently used rows over the cap
+            self._conn.execute(
+                """DELETE FROM query_embeddings WHERE rowid IN (
+                    SELECT rowid FROM query_embeddings ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_query_entries,),
+            )
+            self._conn.commit()
+
+
+class EmbeddingStats:
+    """Counters shared by every thread using one CachedBatchEmbeddings."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.chunks = 0
+        self.cache_hits = 0
+        self.batches = 0
+        self.seconds = 0.0
+        self.query_memory_hits = 0
+        self.query_disk_hits = 0
+        self.query_misses = 0
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+    @property
+    def cache_hit_rate(self) -> float:
+        return self.cache_hits / self.chunks if self.chunks else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.chunks} chunks in {self.seconds:.2f}s "
+            f"({self.chunks_per_second:.1f} chunks/s, {self.cache_hit_rate:.0%} cache hits, "
+            f"{self.batches} batches)"
+        )
+
+    def query_summary(self) -> str:
+        return (
+            f"query embeddings: {self.query_memory_hits} memory hits, "
+            f"{self.query_disk_hits} disk hits, {self.query_misses} misses"
+        )
+
+
+# -------------------------------
+# Batched, concurrent embeddings with cache reuse
+# -------------------------------
+class CachedBatchEmbeddings(Embeddings):
+    """Wraps an Embeddings model: cached texts are reused, the rest are embedded
+    in fixed-size batches on a bounded thread pool. Queries go through an
+    in-memory LRU, then the SQLite cache, before hitting the model."""
+
+    def __init__(
+        self,
+        embeddings,
+        cache: EmbeddingCache,
+        batch_size=64,
+        max_workers=4,
+        model_name=None,
+        query_lru_size=256,
+    ):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.model_name = model_name or getattr(embeddings, "model", type(embeddings).__name__)
+        self.query_lru = LRUCache(query_lru_size)
+        self.stats = EmbeddingStats()
+
+    def embed_documents(self, texts):
+        start = time.perf_counter()
+        hashes = [text_hash(t) for t in texts]
+        vectors = self.cache.get_many(self.model_name, set(hashes))
+        hits = sum(1 for h in hashes if h in vectors)
+
+        # Embed each distinct missing text once, even if it repeats in this call
+        missing = {}
+        for h, t in zip(hashes, texts):
+            if h not in vectors:
+                missing.setdefault(h, t)
+        missing_hashes = list(missing)
+        batches = [
+            missing_hashes[i:i + self.batch_size]
+            for i in range(0, len(missing_hashes), self.batch_size)
+        ]
+
+        if batches:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                results = pool.map(
+                    lambda batch: self.embeddings.embed_documents([missing[h] for h in batch]),
+                    batches,
+                )
+                # Results come back in batch order; write each batch as it lands
+                for batch, batch_vectors in zip(batches, results):
+                    items = list(zip(batch, batch_vectors))
+                    self.cache.put_many(self.model_name, items)
+                    vectors.update(items)
+
+        self.stats.add(chunks=len(texts), cache_hits=hits, batches=len(batches), seconds=time.perf_counter() - start)
+        return [vectors[h] for h in hashes]
+
+    def embed_query(self, text):
+        key = text_hash(normalize_query(text))
+        vector = self.query_lru.get(key)
+        if vector is not None:
+            self.stats.add(query_memory_hits=1)
+            return vector
+
+        vector = self.cache.get_query(self.model_name, key)
+        if vector is not None:
+            self.stats.add(query_disk_hits=1)
+        else:
+            self.stats.add(query_misses=1)
+            vector = self.embeddings.embed_query(text)
+            self.cache.put_query(self.model_name, key, vector)
+
+        self.query_lru.put(key, vector)
+        return vector
@@ -0,0 +1,177 @@
+import json
+import mmap
+import os
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+VECTORS_FILE = "vectors.npy"
+OFFSETS_FILE = "offsets.npy"
+IDS_FILE = "ids.npy"
+CHUNKS_FILE = "chunks.bin"
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+# -------------------------------
+# Memory-mapped flat vector index
+# -------------------------------
+class FlatIndex(VectorStore):
+    """Exact cosine search over normalized embeddings in a memory-mapped .npy.
+
+    Chunk records (text + metadata as JSON) sit back to back in chunks.bin and
+    are located through offsets.npy, so opening the index reads no data up
+    front. Adds and deletes are buffered until persist(), which rewrites the
+    files and swaps them in.
+    """
+
+    def __init__(self, persist_directory: str, embedding_function, dtype="float32", block_rows=65536):
+        self.persist_directory = persist_directory
+        self._embedding = embedding_function
+        self.dtype = np.dtype(dtype)
+        self.block_rows = block_rows
+        self._pending = []  # (id, vector, record bytes)
+        self._pending_deletes = set()
+        os.makedirs(persist_directory, exist_ok=True)
+        self._open()
+
+    def _path(self, name):
+        return os.path.join(self.persist_directory, name)
+
+    def _open(self):
+        self._vectors = self._offsets = self._ids = self._chunks = None
+        self._chunks_file = None
+        try:
+            vectors = np.load(self._path(VECTORS_FILE), mmap_mode="r")
+            offsets = np.load(self._path(OFFSETS_FILE), mmap_mode="r")
+            ids = np.load(self._path(IDS_FILE), mmap_mode="r")
+        except FileNotFoundError:
+            return
+        # A half-finished persist leaves mismatched files: treat the index as empty
+        if not (len(vectors) == len(ids) == len(offsets) - 1) or len(vectors) == 0:
+            return
+        self._vectors, self._offsets, self._ids = vectors, offsets, ids
+        self._chunks_file = open(self._path(CHUNKS_FILE), "rb")
+        self._chunks = mmap.mmap(self._chunks_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _close(self):
+        if self._chunks is not None:
+            self._chunks.close()
+            self._chunks_file.close()
+        # Drop the memmaps before their files are replaced
+        self._vectors = self._offsets = self._ids = self._chunks = self._chunks_file = None
+
+    @property
+    def embeddings(self):
+        return self._embedding
+
+    @property
+    def count(self) -> int:
+        return 0 if self._ids is None else len(self._ids)
+
+    # ---- writes ----
+    def add_texts(self, texts, metadatas=None, ids=None, **kwargs):
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        if ids is None:
+            raise ValueError("FlatIndex needs explicit ids (use ingest.chunk_id)")
+        vectors = _normalize(np.asarray(self._embedding.embed_documents(texts), dtype=np.float32))
+        for cid, vector, text, metadata in zip(ids, vectors, texts, metadatas):
+            record = json.dumps({"page_content": text, "metadata": metadata}).encode("utf-8")
+            self._pending.append((cid, vector, record))
+        return list(ids)
+
+    def delete(self, ids=None, **kwargs):
+        self._pending_deletes.update(ids or [])
+        self._pending = [p for p in self._pending if p[0] not in self._pending_deletes]
+
+    def get(self, include=None, **kwargs):
+        """Chroma-compatible subset used by ingest.sync_vectorstore."""
+        stored = [] if self._ids is None else [i.decode("ascii") for i in self._ids]
+        return {"ids": stored + [p[0] for p in self._pending]}
+
+    def persist(self):
+        if not self._pending and not self._pending_deletes:
+            return
+        if self._ids is not None:
+            deleted = np.array(sorted(self._pending_deletes), dtype=self._ids.dtype)
+            keep = np.flatnonzero(~np.isin(self._ids, deleted))
+            dim = self._vectors.shape[1]
+        else:
+            keep = np.array([], dtype=np.int64)
+            dim = len(self._pending[0][1]) if self._pending else 0
+        total = len(keep) + len(self._pending)
+
+        all_ids = [self._ids[i].decode("ascii") for i in keep] + [p[0] for p in self._pending]
+        width = max((len(i) for i in all_ids), default=1)
+        tmp = {name: self._path(name + ".tmp") for name in (VECTORS_FILE, OFFSETS_FILE, IDS_FILE, CHUNKS_FILE)}
+
+        vectors = np.lib.format.open_memmap(tmp[VECTORS_FILE], mode="w+", dtype=self.dtype, shape=(total, dim))
+        offsets = np.zeros(total + 1, dtype=np.int64)
+        with open(tmp[CHUNKS_FILE], "wb") as chunks:
+            row = 0
+            # Copy surviving rows block by block so memory stays bounded
+            for start in range(0, len(keep), self.block_rows):
+                block = keep[start:start + self.block_rows]
+                vectors[row:row + len(block)] = self._vectors[block]
+                for i in block:
+                    chunks.write(self._chunks[self._offsets[i]:self._offsets[i + 1]])
+                    offsets[row + 1] = chunks.tell()
+                    row += 1
+            for _, vector, record in self._pending:
+                vectors[row] = vector
+                chunks.write(record)
+                offsets[row + 1] = chunks.tell()
+                row += 1
+        vectors.flush()
+        del vectors
+        # np.save would append ".npy" to a bare path, so hand it open files
+        with open(tmp[OFFSETS_FILE], "wb") as file:
+            np.save(file, offsets)
+        with open(tmp[IDS_FILE], "wb") as file:
+            np.save(file, np.array(all_ids, dtype=f"S{width}"))
+
+        self._close()
+        for name, path in tmp.items():
+            os.replace(path, self._path(name))
+        self._pending, self._pending_deletes = [], set()
+        self._open()
+
+    # ---- reads ----
+    def _record(self, i):
+        data = json.loads(self._chunks[self._offsets[i]:self._offsets[i + 1]])
+        return Document(page_content=data["page_content"], metadata=data["metadata"], id=self._ids[i].decode("ascii"))
+
+    def similarity_search_with_score(self, query, k=4, **kwargs):
+        if self._vectors is None:
+            return []
+        q = _normalize(np.asarray(self._embedding.embed_query(query), dtype=np.float32))
+        if self._vectors.dtype == np.float32:
+            scores = self._vectors @ q
+        else:
+            # float16 has no BLAS path: upcast block by block
+            scores = np.concatenate([
+                self._vectors[start:start + self.block_rows].astype(np.float32) @ q
+                for start in range(0, len(self._vectors), self.block_rows)
+            ])
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._record(i), float(scores[i])) for i in top]
+
+    def similarity_search(self, query, k=4, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def _select_relevance_score_fn(self):
+        return lambda score: score
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, ids=None, persist_directory="./flat_index", **kwargs):
+        index = cls(persist_directory, embedding, **kwargs)
+        index.add_texts(texts, metadatas, ids)
+        index.persist()
+        return index
@@ -0,0 +1,167 @@
+import json
+import os
+import struct
+import threading
+import time
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import message_to_dict, messages_from_dict
+
+# One fixed-size entry per message: byte offset of its line in the data file
+OFFSET = struct.Struct("<Q")
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+# -------------------------------
+# Append-only chat history
+# -------------------------------
+class AppendOnlyChatHistory(BaseChatMessageHistory):
+    """Chat history as JSON lines plus a fixed-size offset index.
+
+    Adding a message appends one line and one index entry; nothing is ever
+    rewritten. The last N messages are found by seeking to entry count-N in
+    the index, so reading them costs O(N) whatever the history length.
+    Writes are flushed every call and fsynced every fsync_every messages or
+    fsync_interval seconds. On open, a torn last line or index entries past
+    the end of the data are dropped and missing index entries are rebuilt.
+
+    With window set, .messages returns only the last `window` messages, which
+    is what ConversationBufferMemory then loads.
+    """
+
+    def __init__(self, path="chat_history.jsonl", window=None, fsync_every=8, fsync_interval=1.0, legacy_path=None):
+        self.path = path
+        self.index_path = os.path.splitext(path)[0] + ".idx"
+        self.window = window
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._recover()
+        self._data = open(self.path, "ab")
+        self._index = open(self.index_path, "ab")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        if legacy_path and self._count == 0:
+            self._migrate(legacy_path)
+
+    def _recover(self):
+        data_size = _size(self.path)
+        if data_size:
+            with open(self.path, "r+b") as data:
+                # Cut a line left half-written by a crash
+                end = data_size
+                while end > 0:
+                    start = max(0, end - 65536)
+                    data.seek(start)
+                    newline = data.read(end - start).rfind(b"\n")
+                    if newline != -1:
+                        end = start + newline + 1
+                        break
+                    end = start
+                if end != data_size:
+                    data.truncate(end)
+                    data_size = end
+
+        count = _size(self.index_path) // OFFSET.size
+        with open(self.index_path, "a+b") as index:
+            # Drop entries that point past the data that actually reached disk
+            while count:
+                index.seek((count - 1) * OFFSET.size)
+                last_offset = OFFSET.unpack(index.read(OFFSET.size))[0]
+                if last_offset < data_size:
+                    break
+                count -= 1
+            index.truncate(count * OFFSET.size)
+
+            # Index any lines written after the last entry
+            next_offset = 0
+            with open(self.path, "a+b") as data:
+                if count:
+                    data.seek(last_offset)
+                    next_offset = last_offset + len(data.readline())
+                data.seek(next_offset)
+                index.seek(0, os.SEEK_END)
+                for line in data:
+                    index.write(OFFSET.pack(next_offset))
+                    next_offset += len(line)
+                    count += 1
+        self._count = count
+        self._data_size = data_size
+
+    def _migrate(self, legacy_path: str):
+        """Imports a FileChatMessageHistory JSON file once."""
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as file:
+                messages = messages_from_dict(json.load(file))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self.add_messages(messages)
+        self.sync()
+
+    def add_messages(self, messages):
+        with self._lock:
+            for message in messages:
+                line = json.dumps(message_to_dict(message), ensure_ascii=False).encode("utf-8") + b"\n"
+                self._data.write(line)
+                self._index.write(OFFSET.pack(self._data_size))
+                self._data_size += len(line)
+                self._count += 1
+            # Data before index, so an entry never points at unwritten bytes
+            self._data.flush()
+            self._index.flush()
+            self._unsynced += len(messages)
+            if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+
+    def add_message(self, message):
+        self.add_messages([message])
+
+    def _sync(self):
+        os.fsync(self._data.fileno())
+        os.fsync(self._index.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def sync(self):
+        with self._lock:
+            self._sync()
+
+    def __len__(self):
+        return self._count
+
+    def tail(self, n: int):
+        """Returns the last n messages without reading anything before them."""
+        with self._lock:
+            n = min(n, self._count)
+            if n <= 0:
+                return []
+            with open(self.index_path, "rb") as index:
+                index.seek((self._count - n) * OFFSET.size)
+                first = OFFSET.unpack(index.read(OFFSET.size))[0]
+            with open(self.path, "rb") as data:
+                data.seek(first)
+                lines = data.read(self._data_size - first).splitlines()
+        return messages_from_dict([json.loads(line) for line in lines])
+
+    @property
+    def messages(self):
+        return self.tail(self.window if self.window else self._count)
+
+    def clear(self):
+        with self._lock:
+            self._data.truncate(0)
+            self._index.truncate(0)
+            self._sync()
+            self._count = 0
+            self._data_size = 0
+
+    def close(self):
+        with self._lock:
+            self._sync()
+            self._data.close()
+            self._index.close()
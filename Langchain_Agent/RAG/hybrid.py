@@ -0,0 +1,123 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Optional
+from pydantic import Field
+from langchain_core.retrievers import BaseRetriever
+
+TOKEN_RE = re.compile(r"\w+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "does", "do", "for", "from", "how",
+    "in", "is", "it", "its", "of", "on", "or", "the", "to", "was", "what", "when",
+    "where", "which", "who", "with",
+}
+
+
+def tokenize(text: str):
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _doc_key(doc):
+    # Same identity as ingest.chunk_id, without hashing on the query path
+    return doc.metadata.get("source", ""), doc.page_content
+
+
+# -------------------------------
+# In-process BM25 inverted index
+# -------------------------------
+class BM25Index:
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)  # term -> [(doc index, term frequency)]
+        self.doc_lengths = []
+        self.docs = []
+        self._ids = set()
+
+    @classmethod
+    def from_documents(cls, docs, **kwargs):
+        index = cls(**kwargs)
+        for doc in docs:
+            index.add(doc)
+        return index
+
+    def add(self, doc):
+        key = _doc_key(doc)
+        if key in self._ids:
+            return
+        self._ids.add(key)
+        tokens = tokenize(doc.page_content)
+        idx = len(self.docs)
+        self.docs.append(doc)
+        self.doc_lengths.append(len(tokens))
+        for term, tf in Counter(tokens).items():
+            self.postings[term].append((idx, tf))
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        n = len(self.docs)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k=4):
+        """Returns ([(doc, score)], confidence). Confidence is the idf-weighted
+        share of query terms found in the top hit (unknown terms count fully)."""
+        terms = set(tokenize(query))
+        if not terms or not self.docs:
+            return [], 0.0
+        avg_len = sum(self.doc_lengths) / len(self.doc_lengths) or 1.0
+        scores = defaultdict(float)
+        matched = defaultdict(set)
+        for term in terms:
+            idf = self.idf(term)
+            for idx, tf in self.postings.get(term, ()):
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[idx] / avg_len)
+                scores[idx] += idf * tf * (self.k1 + 1) / (tf + norm)
+                matched[idx].add(term)
+        if not scores:
+            return [], 0.0
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        total_idf = sum(self.idf(t) for t in terms)
+        confidence = sum(self.idf(t) for t in matched[ranked[0][0]]) / total_idf
+        return [(self.docs[idx], score) for idx, score in ranked], confidence
+
+
+# -------------------------------
+# BM25 + dense retrieval with reciprocal-rank fusion
+# -------------------------------
+class HybridRetriever(BaseRetriever):
+    """Fuses BM25 and Chroma results with RRF. When the top BM25 hit covers the
+    query and clearly beats the runner-up, answers lexically and skips the
+    embedding call altogether. That shortcut needs at least k BM25 matches:
+    with fewer, the dense results fill the list up to k."""
+
+    vectorstore: Any
+    bm25: Any = None
+    k: int = 4
+    rrf_k: int = 60
+    lexical_confidence: float = 0.9
+    lexical_margin: float = 1.5
+    stats: dict = Field(default_factory=lambda: {"lexical": 0, "hybrid": 0})
+
+    def _get_relevant_documents(self, query: str, *, run_manager, k: Optional[int] = None):
+        k = k or self.k
+        if self.bm25 is None:
+            return self.vectorstore.similarity_search(query, k=k)
+        lexical, confidence = self.bm25.search(query, k * 2)
+
+        if len(lexical) >= k and confidence >= self.lexical_confidence:
+            runner_up = lexical[1][1] if len(lexical) > 1 else 0.0
+            if lexical[0][1] >= self.lexical_margin * runner_up:
+                self.stats["lexical"] += 1
+                return [doc for doc, _ in lexical[:k]]
+
+        self.stats["hybrid"] += 1
+        dense = self.vectorstore.similarity_search(query, k=k * 2)
+        fused = defaultdict(float)
+        docs = {}
+        for ranking in ([doc for doc, _ in lexical], dense):
+            for rank, doc in enumerate(ranking):
+                key = _doc_key(doc)
+                docs.setdefault(key, doc)
+                fused[key] += 1.0 / (self.rrf_k + rank + 1)
+        best = sorted(fused, key=fused.get, reverse=True)[:k]
+        return [docs[key] for key in best]
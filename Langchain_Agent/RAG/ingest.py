@@ -0,0 +1,240 @@
+import hashlib
+import json
+import os
+import sqlite3
+from langchain_core.documents import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_community.vectorstores import Chroma
+from embedding_cache import CachedBatchEmbeddings, EmbeddingCache
+from hybrid import BM25Index, HybridRetriever
+from flat_index import FlatIndex
+
+# Manifest lives inside the persist dir so deleting the store also resets it
+MANIFEST_FILE = "ingest_manifest.sqlite3"
+LEGACY_MANIFEST_FILE = "ingest_manifest.json"
+TEXT_SUFFIXES = (".txt", ".md")
+
+
+def chunk_id(doc) -> str:
+    """Stable ID for a chunk: hash of its source and its text."""
+    source = doc.metadata.get("source", "")
+    return hashlib.sha256(f"{source}\0{doc.page_content}".encode("utf-8")).hexdigest()
+
+
+# -------------------------------
+# Streaming loader / splitter
+# -------------------------------
+def iter_files(path: str):
+    """Yields path itself if it is a file, else every text file below it."""
+    if os.path.isfile(path):
+        yield path
+        return
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(TEXT_SUFFIXES):
+                yield os.path.join(root, name)
+
+
+def iter_chunks(data_path="./data.txt", chunk_size=100, chunk_overlap=10, block_size=1 << 20):
+    """Lazily yields chunk Documents, reading each file block_size characters
+    at a time. Only the current block plus one carried-over chunk is held in
+    memory, so peak usage does not depend on file or corpus size."""
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    for file_path in iter_files(data_path):
+        with open(file_path, "r", encoding="utf-8", errors="replace") as file:
+            carry = ""
+            while True:
+                block = file.read(block_size)
+                buffer = carry + block
+                pieces = splitter.split_text(buffer)
+                if not block:
+                    for text in pieces:
+                        yield Document(page_content=text, metadata={"source": file_path})
+                    break
+                if len(pieces) < 2:
+                    carry = buffer
+                    continue
+                # The last piece may be cut at the block boundary: re-split it with the next block
+                for text in pieces[:-1]:
+                    yield Document(page_content=text, metadata={"source": file_path})
+                start = buffer.rfind(pieces[-1])
+                carry = buffer[start:] if start != -1 else pieces[-1]
+
+
+def load_chunks(data_path="./data.txt", chunk_size=100, chunk_overlap=10):
+    return list(iter_chunks(data_path, chunk_size, chunk_overlap))
+
+
+# -------------------------------
+# Ingestion manifest
+# -------------------------------
+class Manifest:
+    """SQLite record of indexed chunk IDs. Each sync stamps the IDs it sees with
+    a run number; anything left with an older stamp was removed from the corpus."""
+
+    def __init__(self, path: str):
+        self.is_new = not os.path.exists(path)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks (id TEXT PRIMARY KEY, source TEXT NOT NULL, run INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS chunks_run ON chunks (run)")
+        self.run = self._conn.execute("SELECT COALESCE(MAX(run), 0) + 1 FROM chunks").fetchone()[0]
+
+    def import_legacy(self, path: str) -> bool:
+        """Loads a JSON manifest written by older versions, if there is one."""
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                chunks = json.load(file)["chunks"]
+        except FileNotFoundError:
+            return False
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO chunks (id, source, run) VALUES (?, ?, 0)", chunks.items()
+        )
+        self._conn.commit()
+        os.remove(path)
+        return True
+
+    def mark(self, batch):
+        """Stamps (chunk_id, doc) pairs with this run. Returns the pairs that were
+        not indexed yet, and how many were indexed by a previous run."""
+        ids = list({cid for cid, _ in batch})
+        marks = ",".join("?" * len(ids))
+        runs = dict(self._conn.execute(f"SELECT id, run FROM chunks WHERE id IN ({marks})", ids))
+        unchanged = sum(1 for run in runs.values() if run != self.run)
+        self._conn.execute(f"UPDATE chunks SET run = ? WHERE id IN ({marks})", [self.run, *ids])
+
+        new = []
+        for cid, doc in batch:
+            if cid not in runs:
+                runs[cid] = self.run
+                new.append((cid, doc))
+        self._conn.executemany(
+            "INSERT INTO chunks (id, source, run) VALUES (?, ?, ?)",
+            [(cid, doc.metadata.get("source", ""), self.run) for cid, doc in new],
+        )
+        return new, unchanged
+
+    def stale_batches(self, batch_size: int):
+        while True:
+            ids = [row[0] for row in self._conn.execute(
+                "SELECT id FROM chunks WHERE run != ? LIMIT ?", (self.run, batch_size)
+            )]
+            if not ids:
+                return
+            yield ids
+            self._conn.execute(f"DELETE FROM chunks WHERE id IN ({','.join('?' * len(ids))})", ids)
+            self._conn.commit()
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def commit(self):
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+def sync_vectorstore(vectorstore, chunks, manifest_path: str, batch_size=256) -> dict:
+    """Embeds only new/changed chunks and deletes removed ones. chunks may be any
+    iterable; it is consumed in batch_size groups and never materialized."""
+    manifest = Manifest(manifest_path)
+    stats = {"added": 0, "removed": 0, "unchanged": 0, "removed_ids": []}
+
+    if manifest.is_new and not manifest.import_legacy(
+        os.path.join(os.path.dirname(manifest_path), LEGACY_MANIFEST_FILE)
+    ):
+        # Store built before manifests existed: its IDs are random, so start clean
+        legacy_ids = vectorstore.get(include=[])["ids"]
+        if legacy_ids:
+            vectorstore.delete(ids=legacy_ids)
+            stats["removed"] += len(legacy_ids)
+
+    def flush(batch):
+        new, unchanged = manifest.mark(batch)
+        if new:
+            vectorstore.add_documents([doc for _, doc in new], ids=[cid for cid, _ in new])
+        # Commit after the upsert so a crash never records chunks that were not stored
+        manifest.commit()
+        stats["added"] += len(new)
+        stats["unchanged"] += unchanged
+
+    batch = []
+    for doc in chunks:
+        batch.append((chunk_id(doc), doc))
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    for ids in manifest.stale_batches(batch_size):
+        vectorstore.delete(ids=ids)
+        stats["removed"] += len(ids)
+        stats["removed_ids"].extend(ids)
+
+    manifest.close()
+    return stats
+
+
+def _index_while_streaming(index, chunks):
+    for doc in chunks:
+        index.add(doc)
+        yield doc
+
+
+def build_retriever(
+    embeddings,
+    persist_dir="./chroma_db",
+    data_path="./data.txt",
+    cache_path="./embedding_cache.sqlite3",
+    batch_size=64,
+    max_workers=4,
+    k=4,
+    hybrid=True,
+    chunk_size=100,
+    chunk_overlap=10,
+    backend="chroma",
+    flat_dtype="float32",
+):
+    """Brings the Chroma store in line with data_path (a file or a directory)
+    and builds the BM25 index over the same chunks. Returns (HybridRetriever, stats).
+
+    backend is "chroma" or "flat" (memory-mapped FlatIndex, optionally
+    float16); both are synced and queried the same way.
+
+    The BM25 index is kept in memory; pass hybrid=False for very large corpora
+    to keep ingestion memory flat and retrieval dense-only. Use
+    bench_chunking.py to pick chunk_size/chunk_overlap for a corpus."""
+    os.makedirs(persist_dir, exist_ok=True)
+    # Cache sits outside persist_dir so a full rebuild still reuses old vectors
+    cached_embeddings = CachedBatchEmbeddings(
+        embeddings, EmbeddingCache(cache_path), batch_size=batch_size, max_workers=max_workers
+    )
+    manifest_path = os.path.join(persist_dir, MANIFEST_FILE)
+    if backend == "flat":
+        vectorstore = FlatIndex(persist_dir, cached_embeddings, dtype=flat_dtype)
+        if os.path.exists(manifest_path):
+            manifest = Manifest(manifest_path)
+            interrupted = manifest.count() != vectorstore.count
+            manifest.close()
+            # A sync stopped before persist(): resync from scratch (vectors come from the cache)
+            if interrupted:
+                os.remove(manifest_path)
+    elif backend == "chroma":
+        vectorstore = Chroma(persist_directory=persist_dir, embedding_function=cached_embeddings)
+    else:
+        raise ValueError(f"Unknown vector store backend: {backend}")
+
+    chunks = iter_chunks(data_path, chunk_size, chunk_overlap)
+    bm25 = None
+    if hybrid:
+        bm25 = BM25Index()
+        chunks = _index_while_streaming(bm25, chunks)
+    stats = sync_vectorstore(vectorstore, chunks, manifest_path)
+    if backend == "flat":
+        vectorstore.persist()
+    stats["embedding"] = cached_embeddings.stats
+    return HybridRetriever(vectorstore=vectorstore, bm25=bm25, k=k), stats
@@ -0,0 +1,34 @@
+import hashlib
+import math
+import re
+from langchain_core.embeddings import Embeddings
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic, offline bag-of-words embeddings (feature hashing).
+
+    Not a substitute for a real model, but texts that share words land close
+    together, which is enough for benchmarks and tests without network access.
+    """
+
+    def __init__(self, size=256):
+        self.size = size
+        self.model = f"hashing-{size}"
+
+    def _embed(self, text: str):
+        vector = [0.0] * self.size
+        for token in TOKEN_RE.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.size
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[bucket] += sign
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts):
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
@@ -1,25 +1,29 @@
 import os
 from dotenv import load_dotenv
-from langchain_community.document_loaders import TextLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import Chroma
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain.prompts import PromptTemplate
 from langchain.memory import ConversationBufferMemory
-from langchain.memory.chat_message_histories import FileChatMessageHistory
+from history_store import AppendOnlyChatHistory
+from ingest import build_retriever, chunk_id
+from answer_cache import SemanticAnswerCache
 load_dotenv()
 
 # Step 1: Load vector store
 embeddings = OpenAIEmbeddings()
-persist_dir = "./chroma_db"
+# VECTOR_BACKEND=flat uses the memory-mapped NumPy index instead of Chroma
+backend = os.getenv("VECTOR_BACKEND", "chroma")
+persist_dir = "./flat_index" if backend == "flat" else "./chroma_db"
 
-if not os.path.exists(persist_dir):
-    print("Creating vector DB...")
-    docs = TextLoader("./data.txt", encoding="utf-8").load()
-    chunks = RecursiveCharacterTextSplitter(chunk_size=100, chunk_overlap=10).split_documents(docs)
-    Chroma.from_documents(chunks, embeddings, persist_directory=persist_dir)
+# Only new/changed chunks of data.txt are embedded; removed ones are deleted.
+# Retrieval fuses BM25 and vector search over the same chunks.
+retriever, stats = build_retriever(embeddings, persist_dir, "./data.txt", backend=backend)
+if stats["added"] or stats["removed"]:
+    print(f"Vector DB synced: {stats['added']} added, {stats['removed']} removed, {stats['unchanged']} unchanged")
+    print(f"Embedding: {stats['embedding']}")
 
-retriever = Chroma(persist_directory=persist_dir, embedding_function=embeddings).as_retriever()
+# Answers for near-identical questions over the same chunks are reused
+answer_cache = SemanticAnswerCache(retriever.vectorstore.embeddings)
+answer_cache.invalidate_chunks(stats["removed_ids"])
 
 # Step 2: Initialize LLM
 llm = ChatOpenAI(model_name="gpt-3.5-turbo", temperature=0)
@@ -28,7 +32,8 @@ llm = ChatOpenAI(model_name="gpt-3.5-turbo", temperature=0)
 memory = ConversationBufferMemory(
     memory_key="chat_history",
     return_messages=True,
-    chat_memory=FileChatMessageHistory("chat_history.txt")
+    # Append-only store; only the last 10 messages are read back each turn
+    chat_memory=AppendOnlyChatHistory("chat_history.jsonl", window=10, legacy_path="chat_history.txt")
 )
 # Step 4: Prompt with memory
 prompt = PromptTemplate.from_template("""
@@ -58,19 +63,21 @@ while True:
     # Get relevant document context
     docs = retriever.invoke(question, k=3)
     context = "\n".join([doc.page_content for doc in docs])
+    chunk_ids = [chunk_id(doc) for doc in docs]
 
-    # Get memory from buffer
-   # Load existing chat history
-    chat_history = memory.load_memory_variables({})["chat_history"]
+    # Get memory from buffer (the history store only returns the last 10 messages)
+    last_10 = memory.load_memory_variables({})["chat_history"]
 
-    # Split into messages (assumes newlines between entries)
-    history_lines = chat_history.strip().split("\n")
-
-    # Keep only the last 10 lines
-    last_10 = history_lines[-10:]
+    # Convert to string format
+    chat_history = "\n".join(
+        f"{'User' if msg.type == 'human' else 'Assistant'}: {msg.content}" for msg in last_10
+    )
 
-    # Convert back to string format
-    chat_history = "\n".join(last_10)
+    cached_answer = answer_cache.lookup(question, chunk_ids, chat_history)
+    if cached_answer is not None:
+        memory.save_context({"input": question}, {"output": cached_answer})
+        print(f"\nAssistant: {cached_answer}")
+        continue
 
     print(f"\nChat History (Last 10):\n{chat_history}")
     # Format prompt
@@ -85,6 +92,12 @@ while True:
 
     # Update memory
     memory.save_context({"input": question}, {"output": response.content})
+    answer_cache.store(question, chunk_ids, response.content, chat_history)
 
     # Print reply
     print(f"\nAssistant: {response.content}")
+
+memory.chat_memory.close()
+print(stats["embedding"].query_summary())
+print(answer_cache.summary())
+print(f"retrieval: {retriever.stats['lexical']} lexical fast path, {retriever.stats['hybrid']} hybrid")
@@ -1,13 +1,12 @@
 import os
 import streamlit as st
 from dotenv import load_dotenv
-from langchain_community.document_loaders import TextLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import Chroma
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain.prompts import PromptTemplate
 from langchain.memory import ConversationBufferMemory
-from langchain.memory.chat_message_histories import FileChatMessageHistory
+from history_store import AppendOnlyChatHistory
+from ingest import build_retriever, chunk_id
+from answer_cache import SemanticAnswerCache
 
 # Load environment variables
 load_dotenv()
@@ -16,17 +15,28 @@ load_dotenv()
 @st.cache_resource
 def initialize_vectorstore():
     embeddings = OpenAIEmbeddings()
-    persist_dir = "./chroma_db"
+    # VECTOR_BACKEND=flat uses the memory-mapped NumPy index instead of Chroma
+    backend = os.getenv("VECTOR_BACKEND", "chroma")
+    persist_dir = "./flat_index" if backend == "flat" else "./chroma_db"
     
-    if not os.path.exists(persist_dir):
-        st.info("Creating vector DB...")
-        docs = TextLoader("./data.txt", encoding="utf-8").load()
-        chunks = RecursiveCharacterTextSplitter(chunk_size=100, chunk_overlap=10).split_documents(docs)
-        Chroma.from_documents(chunks, embeddings, persist_directory=persist_dir)
+    # Incremental sync: only new/changed chunks of data.txt get embedded.
+    # The retriever fuses BM25 and vector search over the same chunks.
+    retriever, stats = build_retriever(embeddings, persist_dir, "./data.txt", backend=backend)
+    if stats["added"] or stats["removed"]:
+        st.info(f"Vector DB synced: {stats['added']} added, {stats['removed']} removed")
     
-    return Chroma(persist_directory=persist_dir, embedding_function=embeddings).as_retriever()
+    return retriever, stats["removed_ids"]
 
-retriever = initialize_vectorstore()
+retriever, removed_chunk_ids = initialize_vectorstore()
+
+# Semantic answer cache shared across sessions
+@st.cache_resource
+def get_answer_cache():
+    cache = SemanticAnswerCache(retriever.vectorstore.embeddings)
+    cache.invalidate_chunks(removed_chunk_ids)
+    return cache
+
+answer_cache = get_answer_cache()
 
 # Initialize LLM
 @st.cache_resource
@@ -41,7 +51,8 @@ def get_memory():
     return ConversationBufferMemory(
         memory_key="chat_history",
         return_messages=True,
-        chat_memory=FileChatMessageHistory("chat_history.txt")
+        # Append-only store; only the last 10 messages are read back each turn
+        chat_memory=AppendOnlyChatHistory("chat_history.jsonl", window=10, legacy_path="chat_history.txt")
     )
 
 memory = get_memory()
@@ -185,6 +196,7 @@ if user_input := st.chat_input("Ask about Company..."):
     # Get relevant document context
     docs = retriever.invoke(user_input, k=3)
     context = "\n".join([doc.page_content for doc in docs])
+    chunk_ids = [chunk_id(doc) for doc in docs]
     
     # Get memory from buffer - properly handle list of messages
     memory_vars = memory.load_memory_variables({})
@@ -192,9 +204,10 @@ if user_input := st.chat_input("Ask about Company..."):
     
     # Convert messages to string format
     chat_history_str = "\n".join([
-        f"{'User' if i % 2 == 0 else 'Assistant'}: {msg.content}" 
-        for i, msg in enumerate(chat_history[-10:])  # Keep last 5 exchanges (10 messages)
+        f"{'User' if msg.type == 'human' else 'Assistant'}: {msg.content}" 
+        for msg in chat_history  # Store returns the last 5 exchanges (10 messages)
     ])
+    cached_answer = answer_cache.lookup(user_input, chunk_ids, chat_history_str)
 
     # Format prompt
     full_prompt = prompt.format(
@@ -209,10 +222,18 @@ if user_input := st.chat_input("Ask about Company..."):
         message_placeholder = st.empty()
         full_response = ""
 
-        # Stream the response token-by-token (or chunk-by-chunk)
-        for chunk in llm.stream(full_prompt):
-            full_response += chunk.content
-            message_placeholder.markdown(full_response + "▌")  # Add blinking cursor
+        if cached_answer is not None:
+            # Cache hit: stream the stored answer word by word, no LLM call
+            for word in cached_answer.split(" "):
+                full_response += word + " "
+                message_placeholder.markdown(full_response + "▌")
+            full_response = cached_answer
+        else:
+            # Stream the response token-by-token (or chunk-by-chunk)
+            for chunk in llm.stream(full_prompt):
+                full_response += chunk.content
+                message_placeholder.markdown(full_response + "▌")  # Add blinking cursor
+            answer_cache.store(user_input, chunk_ids, full_response, chat_history_str)
 
         message_placeholder.markdown(full_response)  # Finalize the message without cursor
 
@@ -0,0 +1,15 @@
+from answer_cache import SemanticAnswerCache
+from local_embeddings import HashingEmbeddings
+
+
+def test_answer_depends_on_chat_history(tmp_path):
+    cache = SemanticAnswerCache(HashingEmbeddings(), path=str(tmp_path / "answers.sqlite3"))
+    chunks = ["c1", "c2"]
+    cache.store("Who is his manager?", chunks, "Rahul", history="User: Tell me about Priya")
+    assert cache.lookup("Who is his manager?", chunks, history="User: Tell me about Priya") == "Rahul"
+    # Same follow-up after a different conversation, or with none: a miss
+    assert cache.lookup("Who is his manager?", chunks, history="User: Tell me about Arjun") is None
+    assert cache.lookup("Who is his manager?", chunks) is None
+    cache.store("What is the leave policy?", chunks, "20 days")
+    assert cache.lookup("What is the leave policy?", list(reversed(chunks))) == "20 days"
+    assert (cache.hits, cache.misses) == (2, 2)
@@ -0,0 +1,77 @@
+import threading
+from collections import Counter
+from embedding_cache import CachedBatchEmbeddings, EmbeddingCache
+from local_embeddings import HashingEmbeddings
+
+
+class CountingEmbeddings(HashingEmbeddings):
+    """HashingEmbeddings that records every text and batch it is asked for."""
+
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+        self.texts = Counter()
+        self.batches = 0
+        self.queries = 0
+
+    def embed_documents(self, texts):
+        with self.lock:
+            self.texts.update(texts)
+            self.batches += 1
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        with self.lock:
+            self.queries += 1
+        return super().embed_query(text)
+
+
+def make(tmp_path, batch_size=4):
+    model = CountingEmbeddings()
+    cache = EmbeddingCache(path=str(tmp_path / "embeddings.sqlite3"))
+    return model, CachedBatchEmbeddings(model, cache, batch_size=batch_size, max_workers=3)
+
+
+def test_batches_distinct_texts_once_and_reuses_them_on_rebuild(tmp_path):
+    model, embeddings = make(tmp_path)
+    texts = [f"chunk {i}" for i in range(10)] + ["chunk 0", "chunk 1"]  # two repeats
+    vectors = embeddings.embed_documents(texts)
+
+    assert vectors[10] == vectors[0] == HashingEmbeddings().embed_query("chunk 0")
+    assert set(model.texts.values()) == {1}  # each distinct text embedded once
+    assert len(model.texts) == 10
+    assert model.batches == embeddings.stats.batches == 3  # 10 distinct texts, 4 per batch
+    assert embeddings.stats.chunks == 12
+    assert embeddings.stats.cache_hit_rate == 0.0
+    assert embeddings.stats.chunks_per_second > 0
+
+    # Rebuild over the same corpus: everything comes from the cache
+    embeddings.embed_documents(texts)
+    assert model.batches == 3
+    assert embeddings.stats.chunks == 24
+    assert embeddings.stats.cache_hit_rate == 0.5
+    assert embeddings.stats.batches == 3
+    assert "24 chunks" in str(embeddings.stats)
+
+
+def test_query_memory_disk_and_model_paths(tmp_path):
+    model, embeddings = make(tmp_path)
+    embeddings.embed_query("How many sick leaves?")
+    embeddings.embed_query("  how many SICK leaves? ")  # same normalized query
+    _, fresh = make(tmp_path)  # new process, same SQLite file
+    fresh.embed_query("How many sick leaves?")
+    assert model.queries == 1
+    assert (embeddings.stats.query_misses, embeddings.stats.query_memory_hits) == (1, 1)
+    assert fresh.stats.query_disk_hits == 1
+
+
+def test_stats_are_exact_under_concurrent_use(tmp_path):
+    _, embeddings = make(tmp_path)
+    embeddings.embed_query("warm up")
+    threads = [threading.Thread(target=lambda: [embeddings.embed_query("warm up") for _ in range(500)])
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert embeddings.stats.query_memory_hits == 4000